@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
@@ -46,15 +47,22 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.LeanSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.LeanAuthenticationMiddleware',
+    'core.middleware.LeanMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# The token authenticated API skips the session, authentication and
+# messages middleware under these paths, the admin keeps them. CSRF stays
+# the stock middleware, the security checks look for it by path, and DRF
+# views are CSRF exempt already.
+LEAN_MIDDLEWARE_PATHS = ['/api/user/', '/api/recipe/']
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -79,16 +87,105 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Seconds a connection is kept open for later requests, 0 closes it after
+# every request and "none" keeps it open for good.
+DB_CONN_MAX_AGE = os.environ.get('DB_CONN_MAX_AGE', '60')
+
+# Set DB_PGBOUNCER=1 when connecting through pgbouncer in transaction
+# pooling mode, where server-side cursors do not survive between queries.
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', '0') == '1'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql',
         'HOST': os.environ.get('DB_HOST'),
+        'PORT': os.environ.get('DB_PORT', ''),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': (
+            None if DB_CONN_MAX_AGE.lower() == 'none'
+            else int(DB_CONN_MAX_AGE)
+        ),
+        # Check persistent connections before the first query of a request.
+        'CONN_HEALTH_CHECKS': (
+            os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1'
+        ),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+# Cache used to look up API tokens and how long (seconds) entries live.
+# Deleted tokens and changed users are only dropped from it when it is
+# shared by every worker process, see `check --deploy`.
+AUTH_TOKEN_CACHE_ALIAS = os.environ.get('AUTH_TOKEN_CACHE_ALIAS', 'default')
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 300))
+
+# Tokens issued by the token endpoint: "db" for DRF Token rows, "signed"
+# for signed access tokens (Authorization: Bearer ...) expiring after
+# AUTH_SIGNED_TOKEN_MAX_AGE seconds.
+AUTH_TOKEN_MODE = os.environ.get('AUTH_TOKEN_MODE', 'db')
+AUTH_SIGNED_TOKEN_MAX_AGE = int(
+    os.environ.get('AUTH_SIGNED_TOKEN_MAX_AGE', 900)
+)
+
+# Cache used for recipe API responses and how long (seconds) entries live.
+# It also holds the per-user data versions writes bump, so it has to be
+# shared by every worker process, see `check --deploy`.
+RECIPE_CACHE_ALIAS = os.environ.get('RECIPE_CACHE_ALIAS', 'default')
+RECIPE_CACHE_TIMEOUT = int(os.environ.get('RECIPE_CACHE_TIMEOUT', 300))
+
+# Build recipe list responses from values() rows instead of serializing
+# model instances. The output is the same, only faster to produce.
+RECIPE_FAST_LIST_SERIALIZATION = (
+    os.environ.get('RECIPE_FAST_LIST_SERIALIZATION', '0') == '1'
+)
+
+# Threads serving the async read endpoints. Each thread holds its own
+# database connection while a request runs.
+ASYNC_VIEW_THREADS = int(os.environ.get('ASYNC_VIEW_THREADS', 20))
+
+# Report query counts and timings of each request in a Server-Timing
+# header and the logs. Requests taking longer than the threshold (in
+# milliseconds) log all their SQL, an empty value turns that off.
+QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION', '0') == '1'
+QUERY_INSTRUMENTATION_SLOW_MS = os.environ.get(
+    'QUERY_INSTRUMENTATION_SLOW_MS',
+    '500',
+)
+QUERY_INSTRUMENTATION_SLOW_MS = (
+    float(QUERY_INSTRUMENTATION_SLOW_MS)
+    if QUERY_INSTRUMENTATION_SLOW_MS else None
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -137,4 +234,19 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Token only, the API paths run without sessions.
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'user.authentication.CachedTokenAuthentication',
+        'user.authentication.SignedTokenAuthentication',
+    ],
+    # orjson backed JSON, falling back to the stdlib when not installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+System check helpers for the project.
+"""
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def warn_if_local_cache(alias_setting, check_id):
+    """Register a deploy check for the cache named by alias_setting.
+
+    The check warns when that cache is local to each process: entries
+    deleted or bumped by one worker would stay current in the others
+    until they expire. Returns the check.
+    """
+
+    def check(app_configs, **kwargs):
+        alias = getattr(settings, alias_setting)
+        if not isinstance(caches[alias], LocMemCache):
+            return []
+        return [
+            checks.Warning(
+                f'{alias_setting} ({alias!r}) uses a local-memory cache.',
+                hint=(
+                    'Invalidations only reach the process that made them. '
+                    'Use a cache shared by every worker, such as memcached '
+                    'or the database cache, when running more than one '
+                    'process.'
+                ),
+                id=check_id,
+            ),
+        ]
+
+    return checks.register(check, checks.Tags.caches, deploy=True)
@@ -0,0 +1,50 @@
+"""
+PostgreSQL backend with health checks for persistent connections.
+"""
+
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL wrapper honouring the CONN_HEALTH_CHECKS setting.
+
+    Django 3.2 only tests a persistent connection after an error, so a
+    connection dropped by the server or a pooler between two requests
+    fails the next request. With CONN_HEALTH_CHECKS enabled the first
+    query of each request runs on a connection that answered SELECT 1,
+    reconnecting otherwise, like Django 4.1 does.
+    """
+    health_check_enabled = False
+    health_check_done = False
+
+    def connect(self):
+        super().connect()
+        self.health_check_enabled = self.settings_dict.get(
+            'CONN_HEALTH_CHECKS',
+            False,
+        )
+        # A new connection does not need checking in this request.
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Called when a request starts and finishes.
+        if self.connection is not None:
+            self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def close_if_health_check_failed(self):
+        """Close the connection if it is stale and was not checked yet."""
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,101 @@
+"""
+Helpers shared by the benchmark commands.
+"""
+import contextlib
+import itertools
+import statistics
+import time
+
+from django.db import transaction
+
+
+WORDS = [
+    'almond', 'apple', 'apricot', 'avocado', 'bacon', 'baked', 'banana',
+    'barley', 'basil', 'bean', 'beef', 'berry', 'biscuit', 'braised',
+    'bread', 'broccoli', 'brown', 'butter', 'cabbage', 'cake', 'caramel',
+    'carrot', 'cheese', 'cherry', 'chicken', 'chili', 'chocolate',
+    'cinnamon', 'coconut', 'cod', 'cookie', 'corn', 'cream', 'crispy',
+    'crumble', 'cucumber', 'curry', 'custard', 'dumpling', 'egg',
+    'fennel', 'fig', 'fried', 'garlic', 'ginger', 'glazed', 'grilled',
+    'ham', 'herb', 'honey', 'kale', 'lamb', 'leek', 'lemon', 'lentil',
+    'lime', 'mango', 'maple', 'mint', 'miso', 'mushroom', 'mustard',
+    'noodle', 'nut', 'oat', 'olive', 'onion', 'orange', 'pancake',
+    'pasta', 'pea', 'peach', 'pear', 'pepper', 'pie', 'plum', 'pork',
+    'potato', 'prawn', 'pumpkin', 'quick', 'rice', 'roasted', 'salad',
+    'salmon', 'salsa', 'sauce', 'sesame', 'smoked', 'soup', 'spicy',
+    'spinach', 'stew', 'sweet', 'taco', 'tart', 'tofu', 'tomato',
+    'tuna', 'vanilla', 'walnut', 'yogurt', 'zucchini',
+]
+
+
+SYLLABLES = [
+    'ba', 'ce', 'di', 'fo', 'gu', 'ka', 'le', 'mi', 'no', 'pu', 'ra', 'se',
+    'ti', 'vo', 'za', 'ber', 'con', 'del', 'fan', 'mar', 'pel', 'ros', 'tan',
+]
+
+
+class TextGenerator:
+    """Generate recipe-like text with a realistic word distribution.
+
+    The vocabulary is the food words plus made-up words built from
+    syllables, drawn with Zipf weights: a few words are very common and
+    most are rare, as in real recipe titles and descriptions.
+    """
+
+    def __init__(self, rng, vocabulary_size=5000):
+        self.rng = rng
+        self.vocabulary = list(WORDS)
+        made_up = (
+            a + b + c
+            for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES
+        )
+        while len(self.vocabulary) < vocabulary_size:
+            self.vocabulary.append(next(made_up))
+        self.cum_weights = list(itertools.accumulate(
+            1 / rank for rank in range(1, len(self.vocabulary) + 1)
+        ))
+
+    def words(self, count):
+        """Return count random words."""
+        return self.rng.choices(
+            self.vocabulary,
+            cum_weights=self.cum_weights,
+            k=count,
+        )
+
+    def sentence(self, low, high):
+        """Return between low and high random words joined by spaces."""
+        return ' '.join(self.words(self.rng.randint(low, high)))
+
+
+@contextlib.contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def timed(func):
+    """Call func and return (result, duration in milliseconds)."""
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def percentile(samples, pct):
+    """Return the pct percentile of samples (nearest rank)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Return mean and tail latencies of samples in milliseconds."""
+    return {
+        'count': len(samples),
+        'mean_ms': round(statistics.mean(samples), 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+    }
@@ -0,0 +1,326 @@
+"""
+Django command to benchmark the recipe and tag API endpoints.
+"""
+import itertools
+import json
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.management.commands._bench import (
+    TextGenerator,
+    rolled_back,
+    summarize,
+    timed,
+)
+from core.models import Ingredient, Recipe, Tag
+
+
+SCENARIOS = [
+    'recipe-list',
+    'recipe-detail',
+    'recipe-create',
+    'recipe-update',
+    'tag-list',
+]
+
+
+def git_commit():
+    """Return the commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API"""
+    help = (
+        'Seed users, recipes, tags and ingredients inside a rolled back '
+        'transaction, then report latencies, throughput and query counts '
+        'of the recipe and tag endpoints as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=1000,
+            help='Recipes per user.',
+        )
+        parser.add_argument('--tags', type=int, default=50, help='Per user.')
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=200,
+            help='Ingredients per user.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Measured requests per scenario.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=10,
+            help='Unmeasured requests per scenario.',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            dest='scenarios',
+            choices=SCENARIOS,
+            help='Scenario to run, can be repeated. Defaults to all.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--cache-hits',
+            action='store_true',
+            help='Repeat identical reads so the response cache answers.',
+        )
+        parser.add_argument('--output', help='File to write the JSON to.')
+        parser.add_argument(
+            '--baseline',
+            help='JSON of an earlier run to compare the p50 latencies to.',
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            default=20,
+            help='Fail when a p50 latency is this many percent above the '
+                 'baseline.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        for name in ('users', 'recipes', 'tags', 'ingredients', 'requests'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be at least 1.')
+
+        rng = random.Random(options['seed'])
+        text = TextGenerator(rng)
+        self.nonce = itertools.count()
+
+        with rolled_back():
+            users = self._seed(text, options)
+            user = users[0]
+            token = Token.objects.create(user=user)
+            self.client = APIClient(HTTP_HOST='localhost')
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            self.recipe_ids = list(
+                Recipe.objects.filter(user=user).values_list('id', flat=True)
+            )
+            self.tag_names = list(
+                Tag.objects.filter(user=user).values_list('name', flat=True)
+            )
+
+            results = {}
+            for name in options['scenarios'] or SCENARIOS:
+                request = getattr(self, f'_{name.replace("-", "_")}')
+                results[name] = self._measure(
+                    lambda: request(rng, text, options),
+                    options,
+                )
+
+        report = {
+            'commit': git_commit(),
+            'options': {
+                name: options[name]
+                for name in (
+                    'users', 'recipes', 'tags', 'ingredients', 'requests',
+                    'warmup', 'seed', 'cache_hits',
+                )
+            },
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['baseline']:
+            self._compare(report, options)
+
+    def _seed(self, text, options):
+        """Create the users with their recipes, tags and ingredients."""
+        rng = text.rng
+        users = get_user_model().objects.bulk_create([
+            get_user_model()(email=f'bench-api-{i}@example.invalid')
+            for i in range(options['users'])
+        ])
+        tags = Tag.objects.bulk_create([
+            Tag(user=user, name=f'{text.sentence(1, 2)} {i}')
+            for user in users
+            for i in range(options['tags'])
+        ])
+        ingredients = Ingredient.objects.bulk_create([
+            Ingredient(user=user, name=f'{text.sentence(1, 3)} {i}')
+            for user in users
+            for i in range(options['ingredients'])
+        ])
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                user=user,
+                title=text.sentence(2, 5).title(),
+                description=text.sentence(10, 40),
+                time_minutes=rng.randint(5, 180),
+                price=rng.randint(100, 9999) / 100,
+            )
+            for user in users
+            for _ in range(options['recipes'])
+        ])
+
+        for field, model, related, per_recipe in (
+            ('tags', Tag, tags, (1, 4)),
+            ('ingredients', Ingredient, ingredients, (3, 10)),
+        ):
+            by_user = {user.id: [] for user in users}
+            for obj in related:
+                by_user[obj.user_id].append(obj)
+            through = getattr(Recipe, field).through
+            column = f'{model._meta.model_name}_id'
+            links = [
+                through(recipe_id=recipe.id, **{column: obj.id})
+                for recipe in recipes
+                for obj in rng.sample(
+                    by_user[recipe.user_id],
+                    min(rng.randint(*per_recipe), len(related) // len(users)),
+                )
+            ]
+            through.objects.bulk_create(links, batch_size=5000)
+            model.objects.adjust_recipe_counts(
+                Counter(getattr(link, column) for link in links)
+            )
+
+        with connection.cursor() as cursor:
+            for model in (Recipe, Tag, Ingredient):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        return users
+
+    def _measure(self, request, options):
+        """Run request and return its latencies, throughput and queries."""
+        for _ in range(options['warmup']):
+            request()
+
+        latencies = []
+        queries = []
+        started = time.perf_counter()
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as captured:
+                response, elapsed = timed(request)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{response.request["REQUEST_METHOD"]} '
+                    f'{response.request["PATH_INFO"]} returned '
+                    f'{response.status_code}: {response.content[:200]}'
+                )
+            latencies.append(elapsed)
+            queries.append(len(captured))
+        duration = time.perf_counter() - started
+
+        return {
+            'throughput_rps': round(len(latencies) / duration, 1),
+            **summarize(latencies),
+            'queries_mean': round(statistics.mean(queries), 2),
+            'queries_max': max(queries),
+        }
+
+    def _read_params(self, options):
+        """Return query params making reads miss the response cache."""
+        if options['cache_hits']:
+            return {}
+        return {'nonce': next(self.nonce)}
+
+    def _detail_url(self, rng):
+        """Return the url of one of the user's recipes."""
+        return reverse(
+            'recipe:recipe-detail',
+            args=[rng.choice(self.recipe_ids)],
+        )
+
+    def _tag_payload(self, rng):
+        """Return a mix of existing and new tags."""
+        names = rng.sample(self.tag_names, min(2, len(self.tag_names)))
+        names.append(f'new tag {next(self.nonce)}')
+        return [{'name': name} for name in names]
+
+    def _recipe_list(self, rng, text, options):
+        return self.client.get(
+            reverse('recipe:recipe-list'),
+            self._read_params(options),
+        )
+
+    def _recipe_detail(self, rng, text, options):
+        return self.client.get(
+            self._detail_url(rng),
+            self._read_params(options),
+        )
+
+    def _recipe_create(self, rng, text, options):
+        return self.client.post(
+            reverse('recipe:recipe-list'),
+            {
+                'title': text.sentence(2, 5).title(),
+                'time_minutes': rng.randint(5, 180),
+                'price': f'{rng.randint(100, 9999) / 100:.2f}',
+                'tags': self._tag_payload(rng),
+            },
+            format='json',
+        )
+
+    def _recipe_update(self, rng, text, options):
+        return self.client.patch(
+            self._detail_url(rng),
+            {
+                'title': text.sentence(2, 5).title(),
+                'tags': self._tag_payload(rng),
+            },
+            format='json',
+        )
+
+    def _tag_list(self, rng, text, options):
+        return self.client.get(
+            reverse('recipe:tag-list'),
+            self._read_params(options),
+        )
+
+    def _compare(self, report, options):
+        """Fail when a p50 latency regressed against the baseline."""
+        with open(options['baseline'], encoding='utf-8') as file:
+            baseline = json.load(file)['scenarios']
+
+        regressions = []
+        for name, result in report['scenarios'].items():
+            if name not in baseline:
+                continue
+            change = (result['p50_ms'] / baseline[name]['p50_ms'] - 1) * 100
+            self.stderr.write(f'{name}: p50 {change:+.1f}%')
+            if change > options['max_regression']:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(
+                f'p50 latency regressed by more than '
+                f'{options["max_regression"]:g}%: {", ".join(regressions)}'
+            )
@@ -0,0 +1,115 @@
+"""
+Django command to benchmark the per-request cost of the middleware stack.
+"""
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.management.commands._bench import rolled_back, summarize, timed
+from core.models import Tag
+
+
+# The stack every request went through before the API paths were lean.
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the middleware stacks"""
+    help = (
+        'Compare request latencies through the full middleware stack and '
+        'the configured MIDDLEWARE, which skips the session based '
+        'middleware on the API paths. Results are printed as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Times to alternate between the stacks.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        stacks = {'full': FULL_MIDDLEWARE, 'lean': settings.MIDDLEWARE}
+        with rolled_back():
+            user = get_user_model().objects.create(
+                email='bench-middleware@example.invalid',
+            )
+            Tag.objects.bulk_create(
+                [Tag(user=user, name=f'tag {i}') for i in range(5)]
+            )
+            token = Token.objects.create(user=user)
+            paths = {
+                'api': reverse('recipe:tag-list'),
+                'admin': reverse('admin:login'),
+            }
+
+            samples = {
+                (stack, name): [] for stack in stacks for name in paths
+            }
+            queries = {}
+            # Alternate so drift in the machine affects both stacks alike.
+            for _ in range(options['rounds']):
+                for stack, middleware in stacks.items():
+                    with override_settings(MIDDLEWARE=middleware):
+                        client = APIClient(HTTP_HOST='localhost')
+                        client.credentials(
+                            HTTP_AUTHORIZATION=f'Token {token.key}'
+                        )
+                        for name, path in paths.items():
+                            queries[stack, name] = self._run(
+                                client,
+                                path,
+                                samples[stack, name],
+                                options,
+                            )
+
+        for name, path in paths.items():
+            result = {'path': path}
+            for stack in stacks:
+                result[stack] = {
+                    **summarize(samples[stack, name]),
+                    'queries': queries[stack, name],
+                }
+            result['p50_saved_ms'] = round(
+                result['full']['p50_ms'] - result['lean']['p50_ms'],
+                3,
+            )
+            self.stdout.write(json.dumps(result))
+
+    def _run(self, client, path, samples, options):
+        """Request path, add the latencies to samples, return the queries."""
+        per_round = max(1, options['requests'] // options['rounds'])
+        for _ in range(options['warmup']):
+            client.get(path)
+
+        for _ in range(per_round):
+            response, elapsed = timed(lambda: client.get(path))
+            if response.status_code != 200:
+                raise CommandError(
+                    f'{path} returned {response.status_code}.'
+                )
+            samples.append(elapsed)
+
+        with CaptureQueriesContext(connection) as captured:
+            client.get(path)
+        return len(captured)
@@ -0,0 +1,96 @@
+"""
+Django command to benchmark the JSON renderers and parsers.
+"""
+import io
+import json
+import random
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.management.commands._bench import TextGenerator, timed
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    """Django command to benchmark JSON rendering and parsing"""
+    help = (
+        'Compare the orjson renderer and parser against the stdlib ones '
+        'on recipe list pages of several sizes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes',
+            default='50,500,5000',
+            help='Comma separated numbers of recipes per page.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        text = TextGenerator(random.Random(options['seed']))
+        for page_size in (
+            int(size) for size in options['page_sizes'].split(',')
+        ):
+            page = self._page(text, page_size)
+            body = JSONRenderer().render(page)
+            if ORJSONRenderer().render(page) != body:
+                raise CommandError('The orjson renderer output differs.')
+
+            result = {'page_size': page_size, 'bytes': len(body)}
+            for name, stdlib, fast in (
+                (
+                    'render',
+                    lambda: JSONRenderer().render(page),
+                    lambda: ORJSONRenderer().render(page),
+                ),
+                (
+                    'parse',
+                    lambda: JSONParser().parse(io.BytesIO(body)),
+                    lambda: ORJSONParser().parse(io.BytesIO(body)),
+                ),
+            ):
+                stdlib_ms = self._median(stdlib, options['repeat'])
+                fast_ms = self._median(fast, options['repeat'])
+                result[f'{name}_stdlib_ms'] = round(stdlib_ms, 3)
+                result[f'{name}_orjson_ms'] = round(fast_ms, 3)
+                result[f'{name}_speedup'] = round(stdlib_ms / fast_ms, 2)
+            self.stdout.write(json.dumps(result))
+
+    def _median(self, func, repeat):
+        """Return the median duration of func in milliseconds."""
+        return statistics.median(timed(func)[1] for _ in range(repeat))
+
+    def _page(self, text, page_size):
+        """Return a cursor page of recipes as the API serializes them."""
+        rng = text.rng
+        return {
+            'next': 'http://localhost/api/recipe/recipes/?cursor=cD0xMjM0',
+            'previous': None,
+            'results': [
+                {
+                    'id': recipe_id,
+                    'title': text.sentence(2, 5).title(),
+                    'time_minutes': rng.randint(5, 180),
+                    'price': f'{rng.randint(100, 9999) / 100:.2f}',
+                    'link': f'https://example.com/recipes/{recipe_id}',
+                    'tags': [
+                        {'id': tag_id, 'name': f'tag {tag_id}',
+                         'recipe_count': rng.randint(1, 500)}
+                        for tag_id in rng.sample(range(1, 50), 3)
+                    ],
+                    'ingredients': [
+                        {'id': ingredient_id,
+                         'name': ' '.join(text.words(2)),
+                         'recipe_count': rng.randint(1, 500)}
+                        for ingredient_id in rng.sample(range(1, 500), 8)
+                    ],
+                }
+                for recipe_id in range(page_size, 0, -1)
+            ],
+        }
@@ -0,0 +1,91 @@
+"""
+Django command to benchmark full-text recipe search.
+"""
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from core.management.commands._bench import (
+    TextGenerator,
+    rolled_back,
+    summarize,
+    timed,
+)
+from core.models import Recipe
+from recipe.search import search_recipes
+
+
+class Command(BaseCommand):
+    """Django command to benchmark recipe search"""
+    help = (
+        'Seed recipes inside a rolled back transaction and compare ranked '
+        'full-text search against a substring scan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        text = TextGenerator(random.Random(options['seed']))
+        terms = text.words(options['queries'])
+        page_size = options['page_size']
+
+        with rolled_back():
+            user = get_user_model().objects.create(
+                email='bench-search@example.invalid',
+            )
+            self._seed(user, text, options['recipes'])
+            queryset = Recipe.objects.filter(user=user)
+
+            def search(term):
+                return list(
+                    search_recipes(queryset, term)
+                    .order_by('-rank', '-id')[:page_size]
+                )
+
+            def scan(term):
+                return list(
+                    queryset.filter(
+                        Q(title__icontains=term)
+                        | Q(description__icontains=term)
+                    ).order_by('-id')[:page_size]
+                )
+
+            for name, func in (('search', search), ('icontains', scan)):
+                samples = [timed(lambda: func(term))[1] for term in terms]
+                self.stdout.write(f'{name}: {summarize(samples)}')
+
+            rarest = max(terms, key=text.vocabulary.index)
+            plan = search_recipes(queryset, rarest).order_by(
+                '-rank', '-id',
+            )[:page_size].explain()
+            self.stdout.write(f'Plan for "{rarest}":\n{plan}')
+            if 'recipe_search_vector_idx' in plan:
+                self.stdout.write(self.style.SUCCESS('GIN index used.'))
+            else:
+                self.stdout.write(self.style.WARNING('GIN index not used.'))
+
+    def _seed(self, user, text, count, batch_size=5000):
+        """Insert count random recipes for user."""
+        rng = text.rng
+        self.stdout.write(f'Seeding {count} recipes...')
+        for start in range(0, count, batch_size):
+            Recipe.objects.bulk_create([
+                Recipe(
+                    user=user,
+                    title=text.sentence(2, 5).title(),
+                    description=text.sentence(10, 40),
+                    time_minutes=rng.randint(5, 180),
+                    price=rng.randint(100, 9999) / 100,
+                )
+                for _ in range(min(batch_size, count - start))
+            ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_recipe')
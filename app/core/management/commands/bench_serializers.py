@@ -0,0 +1,143 @@
+"""
+Django command to benchmark the recipe list serialization paths.
+"""
+import json
+import random
+import statistics
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from core.management.commands._bench import TextGenerator, rolled_back, timed
+from core.models import Ingredient, Recipe, Tag
+from recipe.projection import RowProjection
+from recipe.serializers import RecipeSerializer
+
+
+class Command(BaseCommand):
+    """Django command to benchmark recipe list serialization"""
+    help = (
+        'Seed recipes inside a rolled back transaction and compare the '
+        'values() list projection against RecipeSerializer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--ingredients', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--min-speedup',
+            type=float,
+            default=5,
+            help='Fail unless the projection is at least this much faster.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        rng = random.Random(options['seed'])
+        text = TextGenerator(rng)
+
+        with rolled_back():
+            user = get_user_model().objects.create(
+                email='bench-serializers@example.invalid',
+            )
+            self._seed(user, text, options)
+            queryset = Recipe.objects.filter(user=user).order_by('-id')
+
+            def serializer_path():
+                recipes = queryset.prefetch_related(
+                    Prefetch('tags', queryset=Tag.objects.order_by('id')),
+                    Prefetch(
+                        'ingredients',
+                        queryset=Ingredient.objects.order_by('id'),
+                    ),
+                )
+                return RecipeSerializer(recipes, many=True).data
+
+            def projection_path():
+                projection = RowProjection.compile(RecipeSerializer())
+                return projection.represent(list(projection.values(queryset)))
+
+            results = {}
+            for name, func in (
+                ('serializer', serializer_path),
+                ('projection', projection_path),
+            ):
+                samples = []
+                for _ in range(options['repeat']):
+                    data, elapsed = timed(func)
+                    samples.append(elapsed)
+                results[name] = (data, statistics.median(samples))
+
+        renderer = JSONRenderer()
+        if (
+            renderer.render(results['serializer'][0])
+            != renderer.render(results['projection'][0])
+        ):
+            raise CommandError('The projection output differs.')
+
+        serializer_ms = results['serializer'][1]
+        projection_ms = results['projection'][1]
+        speedup = serializer_ms / projection_ms
+        self.stdout.write(json.dumps({
+            'recipes': options['recipes'],
+            'serializer_ms': round(serializer_ms, 1),
+            'projection_ms': round(projection_ms, 1),
+            'speedup': round(speedup, 2),
+        }))
+        if speedup < options['min_speedup']:
+            raise CommandError(
+                f'Projection is {speedup:.1f}x faster, expected at least '
+                f'{options["min_speedup"]}x.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Projection is {speedup:.1f}x faster.'
+        ))
+
+    def _seed(self, user, text, options, batch_size=5000):
+        """Insert recipes with a few tags and ingredients each."""
+        rng = text.rng
+        count = options['recipes']
+        self.stdout.write(f'Seeding {count} recipes...')
+        tags = Tag.objects.bulk_create([
+            Tag(user=user, name=f'tag {i}') for i in range(options['tags'])
+        ])
+        ingredients = Ingredient.objects.bulk_create([
+            Ingredient(user=user, name=f'ingredient {i}')
+            for i in range(options['ingredients'])
+        ])
+
+        for start in range(0, count, batch_size):
+            recipes = Recipe.objects.bulk_create([
+                Recipe(
+                    user=user,
+                    title=text.sentence(2, 5).title(),
+                    description=text.sentence(10, 40),
+                    time_minutes=rng.randint(5, 180),
+                    price=rng.randint(100, 9999) / 100,
+                    link=f'https://example.com/{start + i}',
+                )
+                for i in range(min(batch_size, count - start))
+            ])
+            for model, field, related, per_recipe in (
+                (Tag, 'tags', tags, 3),
+                (Ingredient, 'ingredients', ingredients, 8),
+            ):
+                through = getattr(Recipe, field).through
+                target = Recipe._meta.get_field(field).m2m_reverse_field_name()
+                links = through.objects.bulk_create([
+                    through(**{'recipe_id': recipe.id, target: obj})
+                    for recipe in recipes
+                    for obj in rng.sample(
+                        related,
+                        min(per_recipe, len(related)),
+                    )
+                ])
+                model.objects.adjust_recipe_counts(
+                    Counter(getattr(link, target + '_id') for link in links)
+                )
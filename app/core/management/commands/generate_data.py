@@ -0,0 +1,314 @@
+"""
+Django command to generate large synthetic datasets for load testing.
+"""
+import itertools
+import random
+import time
+from array import array
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from core.management.commands._bench import TextGenerator
+from core.models import Ingredient, Recipe, Tag
+
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def copy_value(value):
+    """Return value in the text format of COPY."""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    return str(value)
+
+
+class CopyStream:
+    """File-like object producing COPY lines as they are read.
+
+    copy_expert pulls the data with read(), so rows are only generated
+    as fast as Postgres takes them and never held in memory at once.
+    """
+
+    def __init__(self, lines, lines_per_chunk=1000):
+        self.lines = iter(lines)
+        self.lines_per_chunk = lines_per_chunk
+        self.buffer = bytearray()
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = ''.join(itertools.islice(self.lines, self.lines_per_chunk))
+            if not chunk:
+                break
+            self.buffer += chunk.encode('utf-8')
+        if size < 0:
+            size = len(self.buffer)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+def zipf_weights(count):
+    """Return cumulative weights making the first items the most common."""
+    return list(itertools.accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    """Django command to generate synthetic data"""
+    help = (
+        'Generate users with recipes, tags and ingredients. The data only '
+        'depends on the options and --seed. Postgres is loaded with COPY, '
+        'other databases with bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=100,
+            help='Average number of recipes per user.',
+        )
+        parser.add_argument('--tags', type=int, default=30, help='Per user.')
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=100,
+            help='Ingredients per user.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--password',
+            default='password123',
+            help='Password of every generated user.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows per insert when COPY is not available.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        for name in ('users', 'recipes', 'tags', 'ingredients'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be at least 1.')
+
+        self.options = options
+        self.seed = options['seed']
+        self.text = TextGenerator(random.Random(self.seed))
+        self.tag_weights = zipf_weights(options['tags'])
+        self.ingredient_weights = zipf_weights(options['ingredients'])
+        self.use_copy = connection.vendor == 'postgresql'
+
+        rng = random.Random(self.seed)
+        mean = options['recipes']
+        self.recipe_counts = [
+            rng.randint(1, 2 * mean - 1) for _ in range(options['users'])
+        ]
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            self.bases = {
+                model: self._next_id(model)
+                for model in (
+                    get_user_model(),
+                    Recipe,
+                    Tag,
+                    Ingredient,
+                    Recipe.tags.through,
+                    Recipe.ingredients.through,
+                )
+            }
+            # Recipes per tag/ingredient, counted while linking them.
+            tag_counts = array('L', [0]) * (options['users'] * options['tags'])
+            ingredient_counts = (
+                array('L', [0]) * (options['users'] * options['ingredients'])
+            )
+
+            # Tags and ingredients go in last, once their counts are known.
+            # Postgres checks the foreign keys at commit.
+            totals = {
+                'users': self._load(get_user_model(), self._users()),
+                'recipes': self._load(Recipe, self._recipes()),
+                'recipe tags': self._load(
+                    Recipe.tags.through,
+                    self._links('tag', self.tag_weights, tag_counts, (0, 4)),
+                ),
+                'recipe ingredients': self._load(
+                    Recipe.ingredients.through,
+                    self._links(
+                        'ingredient',
+                        self.ingredient_weights,
+                        ingredient_counts,
+                        (3, 10),
+                    ),
+                ),
+                'tags': self._load(Tag, self._named(Tag, tag_counts)),
+                'ingredients': self._load(
+                    Ingredient,
+                    self._named(Ingredient, ingredient_counts),
+                ),
+            }
+            self._reset_sequences()
+
+        if self.use_copy:
+            with connection.cursor() as cursor:
+                for model in self.bases:
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        for name, count in totals.items():
+            self.stdout.write(f'{count} {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {rows} rows in {elapsed:.1f}s '
+            f'({rows / elapsed:.0f} rows/s).'
+        ))
+
+    def _next_id(self, model):
+        """Return the first id after the existing rows of model."""
+        last = model.objects.order_by('-id').values_list('id', flat=True)
+        return (last.first() or 0) + 1
+
+    def _rng(self, name, user_index):
+        """Return the random generator of one pass over one user."""
+        return random.Random(f'{self.seed}:{name}:{user_index}')
+
+    def _users(self):
+        password = make_password(self.options['password'])
+        base = self.bases[get_user_model()]
+        for index in range(self.options['users']):
+            self.text.rng = self._rng('user', index)
+            yield {
+                'id': base + index,
+                'email': f'user{base + index}@example.invalid',
+                'name': self.text.sentence(2, 2).title(),
+                'password': password,
+            }
+
+    def _recipes(self):
+        base = self.bases[Recipe]
+        user_base = self.bases[get_user_model()]
+        recipe_id = base
+        for index, count in enumerate(self.recipe_counts):
+            rng = self.text.rng = self._rng('recipe', index)
+            for _ in range(count):
+                yield {
+                    'id': recipe_id,
+                    'user_id': user_base + index,
+                    'title': self.text.sentence(2, 5).title(),
+                    'description': self.text.sentence(10, 40),
+                    'time_minutes': rng.randint(5, 180),
+                    'price': f'{rng.randint(100, 9999) / 100:.2f}',
+                    'link': '',
+                }
+                recipe_id += 1
+
+    def _links(self, name, weights, counts, per_recipe):
+        """Link every recipe to popular-first tags or ingredients."""
+        through = getattr(Recipe, f'{name}s').through
+        model_base = self.bases[getattr(through, name).field.related_model]
+        per_user = len(weights)
+        link_id = self.bases[through]
+        recipe_id = self.bases[Recipe]
+        column = f'{name}_id'
+        for index, count in enumerate(self.recipe_counts):
+            rng = self._rng(f'{name} links', index)
+            first = index * per_user
+            for _ in range(count):
+                for offset in set(rng.choices(
+                    range(per_user),
+                    cum_weights=weights,
+                    k=rng.randint(*per_recipe),
+                )):
+                    counts[first + offset] += 1
+                    yield {
+                        'id': link_id,
+                        'recipe_id': recipe_id,
+                        column: model_base + first + offset,
+                    }
+                    link_id += 1
+                recipe_id += 1
+
+    def _named(self, model, counts):
+        """Yield the tags or ingredients with their recipe counts."""
+        name = model._meta.model_name
+        base = self.bases[model]
+        user_base = self.bases[get_user_model()]
+        per_user = len(counts) // self.options['users']
+        for index in range(self.options['users']):
+            self.text.rng = self._rng(name, index)
+            for offset in range(per_user):
+                position = index * per_user + offset
+                yield {
+                    'id': base + position,
+                    'user_id': user_base + index,
+                    # The suffix keeps the names unique per user.
+                    'name': f'{self.text.sentence(1, 2)} {offset + 1}',
+                    'recipe_count': counts[position],
+                }
+
+    def _load(self, model, rows):
+        """Insert the rows of model and return how many there were."""
+        fields = model._meta.concrete_fields
+        defaults = [(field.attname, field.get_default()) for field in fields]
+        total = 0
+
+        def values():
+            nonlocal total
+            for row in rows:
+                total += 1
+                yield [
+                    row.get(attname, default) for attname, default in defaults
+                ]
+
+        if self.use_copy:
+            columns = ', '.join(
+                connection.ops.quote_name(field.column) for field in fields
+            )
+            lines = (
+                '\t'.join(map(copy_value, row)) + '\n' for row in values()
+            )
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+                    f'({columns}) FROM STDIN',
+                    CopyStream(lines),
+                )
+        else:
+            attnames = [attname for attname, _ in defaults]
+            objs = (model(**dict(zip(attnames, row))) for row in values())
+            while True:
+                batch = list(
+                    itertools.islice(objs, self.options['batch_size'])
+                )
+                if not batch:
+                    break
+                model.objects.bulk_create(batch)
+        return total
+
+    def _reset_sequences(self):
+        """Move the id sequences past the inserted rows."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(),
+            list(self.bases),
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,208 @@
+"""
+Django command to bulk import recipes for a user from NDJSON or CSV.
+"""
+import csv
+import json
+import time
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.caching import bump_data_version
+
+
+FORMATS = ['ndjson', 'csv']
+LIST_SEPARATOR = '|'
+
+
+def _names(value, model):
+    """Return the names in a list of dicts/strings or in a CSV cell.
+
+    Names are stripped and blank ones dropped. Raises ValueError when
+    value is not a list of names or a name is too long for model.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        items = value.split(LIST_SEPARATOR)
+    elif isinstance(value, list):
+        items = [
+            item.get('name') if isinstance(item, dict) else item
+            for item in value
+        ]
+    else:
+        raise ValueError(f'Expected a list of names, got {value!r}.')
+
+    max_length = model._meta.get_field('name').max_length
+    names = []
+    for item in items:
+        if not isinstance(item, str):
+            raise ValueError(f'Expected a name, got {item!r}.')
+        name = item.strip()
+        if len(name) > max_length:
+            raise ValueError(
+                f'Name longer than {max_length} characters: {name[:20]}...'
+            )
+        if name:
+            names.append(name)
+    return names
+
+
+def read_ndjson(handle):
+    """Yield (line number, row) for every non-blank line of the file."""
+    for line_number, line in enumerate(handle, 1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as error:
+                yield line_number, error
+
+
+def read_csv(handle):
+    """Yield (line number, row) for every row of the file."""
+    for line_number, row in enumerate(csv.DictReader(handle), 2):
+        yield line_number, row
+
+
+class Command(BaseCommand):
+    """Django command to import recipes in bulk"""
+    help = 'Import recipes, tags and ingredients for a user from a file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON or CSV file to import.')
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Email of the user that will own the recipes.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='File format, guessed from the extension by default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Recipes written per bulk insert.',
+        )
+        parser.add_argument(
+            '--commit-every',
+            type=int,
+            default=10,
+            help='Batches written per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Cannot tell the format of {path}, use --format.'
+            )
+        if options['batch_size'] < 1 or options['commit_every'] < 1:
+            raise CommandError('Batch sizes must be positive.')
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["user"]}.')
+
+        reader = read_ndjson if file_format == 'ndjson' else read_csv
+        per_commit = options['batch_size'] * options['commit_every']
+        self.imported = self.skipped = 0
+        started = time.monotonic()
+
+        with path.open(newline='', encoding='utf-8') as handle:
+            entries = self._parse(user, reader(handle))
+            while True:
+                chunk = list(islice(entries, per_commit))
+                if not chunk:
+                    break
+                with transaction.atomic():
+                    for start in range(0, len(chunk), options['batch_size']):
+                        self._write_batch(
+                            user,
+                            chunk[start:start + options['batch_size']],
+                        )
+                bump_data_version(user.id)
+                self.imported += len(chunk)
+                self._report_progress(started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} recipes, skipped {self.skipped} '
+            f'invalid rows in {time.monotonic() - started:.1f}s.'
+        ))
+
+    def _parse(self, user, rows):
+        """Yield (recipe, tag names, ingredient names) for valid rows."""
+        for line_number, row in rows:
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                recipe = Recipe(
+                    user=user,
+                    title=row.get('title') or '',
+                    description=row.get('description') or '',
+                    time_minutes=int(row.get('time_minutes')),
+                    price=Decimal(str(row.get('price'))),
+                    link=row.get('link') or '',
+                )
+                recipe.clean_fields(exclude=['user'])
+                tags = _names(row.get('tags'), Tag)
+                ingredients = _names(row.get('ingredients'), Ingredient)
+            except (
+                AttributeError,
+                TypeError,
+                ValueError,
+                InvalidOperation,
+                ValidationError,
+            ) as error:
+                self.skipped += 1
+                self.stderr.write(f'Skipping line {line_number}: {error}')
+                continue
+
+            yield recipe, tags, ingredients
+
+    def _write_batch(self, user, batch):
+        """Insert a batch of recipes and link their tags and ingredients."""
+        recipes = Recipe.objects.bulk_create(
+            [recipe for recipe, _, _ in batch]
+        )
+        for model, field, position in (
+            (Tag, 'tags', 1),
+            (Ingredient, 'ingredients', 2),
+        ):
+            objects = model.objects.get_or_create_by_names(
+                user,
+                [name for entry in batch for name in entry[position]],
+            )
+            through = getattr(Recipe, field).through
+            target = Recipe._meta.get_field(field).m2m_reverse_field_name()
+            links = [
+                through(**{
+                    'recipe_id': recipe.id,
+                    target + '_id': objects[name].id,
+                })
+                for recipe, entry in zip(recipes, batch)
+                for name in set(entry[position])
+            ]
+            through.objects.bulk_create(links, ignore_conflicts=True)
+            model.objects.adjust_recipe_counts(
+                Counter(getattr(link, target + '_id') for link in links)
+            )
+
+    def _report_progress(self, started):
+        """Write the running total and throughput."""
+        elapsed = time.monotonic() - started
+        rate = self.imported / elapsed if elapsed else 0
+        self.stdout.write(
+            f'Imported {self.imported} recipes ({rate:.0f} recipes/s)'
+        )
@@ -0,0 +1,189 @@
+"""
+Django command to load test running API endpoints with concurrent clients.
+"""
+import asyncio
+import itertools
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from core.management.commands._bench import summarize
+from core.models import Recipe, Tag
+
+
+DEFAULT_PATHS = [
+    '/api/recipe/recipes/',
+    '/api/recipe/async/recipes/',
+]
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response, return (status, keep alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by the server.')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+
+    return status, headers.get('connection') != 'close'
+
+
+class Command(BaseCommand):
+    """Django command to load test API endpoints"""
+    help = (
+        'Hit running API endpoints with concurrent keep-alive clients and '
+        'report throughput and latencies as JSON, one line per path.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='http://127.0.0.1:8000',
+            help='Base URL of the running server.',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Path to load, can be repeated. Defaults to the sync and '
+                 'async recipe lists.',
+        )
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Seconds to load each path for.',
+        )
+        parser.add_argument(
+            '--token',
+            help='API token to use instead of seeding a temporary user.',
+        )
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=200,
+            help='Recipes to seed for the temporary user.',
+        )
+        parser.add_argument(
+            '--cache-hits',
+            action='store_true',
+            help='Repeat identical URLs so the response cache answers.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Only http:// URLs are supported.')
+
+        user = None
+        token = options['token']
+        if token is None:
+            user, token = self._seed(options['recipes'])
+        try:
+            for path in options['paths'] or DEFAULT_PATHS:
+                result = asyncio.run(self._load(url, path, token, options))
+                self.stdout.write(json.dumps(result))
+        finally:
+            if user is not None:
+                user.delete()
+
+    def _seed(self, count):
+        """Create a temporary user with recipes and return (user, key)."""
+        user = get_user_model().objects.create_user(
+            email='load-test@example.invalid',
+        )
+        tags = Tag.objects.bulk_create(
+            [Tag(user=user, name=f'tag {i}') for i in range(10)]
+        )
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                user=user,
+                title=f'Load test recipe {i}',
+                time_minutes=10,
+                price='5.00',
+            )
+            for i in range(count)
+        ])
+        through = Recipe.tags.through
+        through.objects.bulk_create([
+            through(recipe_id=recipe.id, tag_id=tag.id)
+            for recipe in recipes
+            for tag in tags[:3]
+        ])
+        Tag.objects.rebuild_recipe_counts([user.id])
+        return user, Token.objects.create(user=user).key
+
+    async def _load(self, url, path, token, options):
+        """Run the clients against path and return the measurements."""
+        host = url.hostname
+        port = url.port or 80
+        deadline = time.monotonic() + options['duration']
+        nonce = itertools.count()
+        latencies = []
+        errors = 0
+
+        async def client():
+            nonlocal errors
+            reader, writer = await asyncio.open_connection(host, port)
+            try:
+                while time.monotonic() < deadline:
+                    target = path
+                    if not options['cache_hits']:
+                        separator = '&' if '?' in path else '?'
+                        target = f'{path}{separator}nonce={next(nonce)}'
+                    writer.write((
+                        f'GET {target} HTTP/1.1\r\n'
+                        f'Host: {url.netloc}\r\n'
+                        f'Authorization: Token {token}\r\n'
+                        'Accept: application/json\r\n\r\n'
+                    ).encode('latin-1'))
+                    started = time.perf_counter()
+                    status, keep_alive = await _read_response(reader)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if status != 200:
+                        errors += 1
+                    if not keep_alive:
+                        writer.close()
+                        reader, writer = await asyncio.open_connection(
+                            host,
+                            port,
+                        )
+            finally:
+                writer.close()
+
+        started = time.monotonic()
+        await asyncio.gather(*(
+            client() for _ in range(options['concurrency'])
+        ))
+        elapsed = time.monotonic() - started
+        if not latencies:
+            raise CommandError(f'No response from {path}.')
+
+        return {
+            'path': path,
+            'concurrency': options['concurrency'],
+            'errors': errors,
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            **summarize(latencies),
+        }
@@ -0,0 +1,44 @@
+"""
+Django command to recount the recipes linked to every tag and ingredient.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Ingredient, Tag
+from recipe.caching import bump_data_version
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the denormalized recipe counters"""
+    help = 'Recount recipe_count on tags and ingredients from the links.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='users',
+            metavar='EMAIL',
+            help='Only rebuild the counters of this user, can be repeated.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry-point for command"""
+        users = None
+        if options['users']:
+            users = list(get_user_model().objects.filter(
+                email__in=options['users'],
+            ).values_list('id', flat=True))
+            if len(users) != len(set(options['users'])):
+                raise CommandError('Some of the given users do not exist.')
+
+        changed_users = set()
+        for model in (Tag, Ingredient):
+            fixed = model.objects.rebuild_recipe_counts(users)
+            changed_users.update(user_id for _, user_id in fixed)
+            self.stdout.write(
+                f'Fixed {len(fixed)} {model._meta.verbose_name} counters.'
+            )
+        for user_id in changed_users:
+            bump_data_version(user_id)
+
+        self.stdout.write(self.style.SUCCESS('Recipe counts rebuilt.'))
@@ -1,9 +1,12 @@
 """
 Django command to wait for the Database to be available.
 """
+import math
+import random
 import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.db.utils import OperationalError
 
 from psycopg2 import OperationalError as Psycopg2Error
@@ -11,19 +14,109 @@ from psycopg2 import OperationalError as Psycopg2Error
 
 class Command(BaseCommand):
     """Django command to wait for Database"""
+    help = (
+        'Wait until a connection to each database can be opened. Exits '
+        'with 0 when they are available, 1 when --timeout runs out and 2 '
+        'for an unknown database alias.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            action='append',
+            dest='databases',
+            help='Database alias to wait for, can be repeated. Defaults to '
+                 '"default".',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait before giving up, 0 waits forever.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.1,
+            help='Seconds to wait after the first failed attempt. The wait '
+                 'doubles after every attempt.',
+        )
+        parser.add_argument(
+            '--max-interval',
+            type=float,
+            default=5,
+            help='Longest wait between two attempts in seconds.',
+        )
+
     def handle(self, *args, **options):
         """Entry-point for command"""
+        aliases = options['databases'] or ['default']
+        unknown = [alias for alias in aliases if alias not in connections]
+        if unknown:
+            raise CommandError(
+                f'Unknown database: {", ".join(unknown)}',
+                returncode=2,
+            )
+
         self.stdout.write('Waiting for Database...')
-        db_up = False
-        while db_up is False:
+        deadline = None
+        if options['timeout']:
+            deadline = time.monotonic() + options['timeout']
+        for alias in aliases:
+            self.wait(alias, deadline, options)
+        self.stdout.write(self.style.SUCCESS('Database Available!'))
+
+    def wait(self, alias, deadline, options):
+        """Retry opening a connection to alias until it works."""
+        attempt = 0
+        while True:
             try:
-                self.check(databases=['default'])
-                db_up = True
-            except (OperationalError, Psycopg2Error):
+                self.ping(alias, deadline)
+                return
+            except (OperationalError, Psycopg2Error) as error:
+                delay = min(
+                    options['max_interval'],
+                    options['interval'] * 2 ** attempt,
+                )
+                # Spread the retries of containers starting together.
+                delay = random.uniform(delay / 2, delay)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise CommandError(
+                            f'Database "{alias}" not available after '
+                            f'{options["timeout"]:g}s: {error}'.strip(),
+                        )
+                    delay = min(delay, remaining)
                 self.stdout.write(
                     self.style.NOTICE(
-                        'Database not Available, waiting for a second...'
+                        f'Database "{alias}" not Available, waiting '
+                        f'{delay:.2f}s...'
                     )
                 )
-                time.sleep(1)
-        self.stdout.write(self.style.SUCCESS('Database Available!'))
+                time.sleep(delay)
+                attempt += 1
+
+    def ping(self, alias, deadline=None):
+        """Open a connection the way requests do and run a query on it.
+
+        With a deadline, opening the connection gives up once it passes,
+        so a host dropping packets cannot stall the command past --timeout.
+        """
+        connection = connections[alias]
+        connection.close()
+        options = connection.settings_dict.setdefault('OPTIONS', {})
+        saved = dict(options)
+        if deadline is not None:
+            # libpq takes whole seconds and treats 0 as no limit.
+            timeout = max(1, math.ceil(deadline - time.monotonic()))
+            options['connect_timeout'] = min(
+                timeout,
+                int(options.get('connect_timeout') or timeout),
+            )
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        finally:
+            options.clear()
+            options.update(saved)
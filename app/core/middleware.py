@@ -0,0 +1,154 @@
+"""
+Middleware for the app.
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """Database execute wrapper timing the queries of a request."""
+
+    def __init__(self):
+        self.queries = []
+        self.duration = 0.0
+        self.slowest = (0.0, None)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries.append((duration, sql))
+            self.duration += duration
+            if duration > self.slowest[0]:
+                self.slowest = (duration, sql)
+
+
+class QueryInstrumentationMiddleware:
+    """Measure the queries and time spent on each request.
+
+    Enabled by the QUERY_INSTRUMENTATION setting. The query count, the
+    database time, the slowest query and the time spent in the view are
+    sent back in a Server-Timing header and logged. Requests slower than
+    QUERY_INSTRUMENTATION_SLOW_MS milliseconds log every statement.
+
+    Only queries run in the request thread are seen, those of the async
+    views run in worker threads and are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        view_ms = (time.perf_counter() - started) * 1000
+
+        db_ms = recorder.duration * 1000
+        slowest_ms = recorder.slowest[0] * 1000
+        count = len(recorder.queries)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{count} queries"',
+            f'db-slowest;dur={slowest_ms:.1f}',
+            f'view;dur={view_ms:.1f}',
+        ])
+
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': count,
+            'db_ms': round(db_ms, 1),
+            'slowest_ms': round(slowest_ms, 1),
+            'view_ms': round(view_ms, 1),
+        }
+        logger.info(
+            ' '.join(f'{name}=%s' for name in fields),
+            *fields.values(),
+            extra=fields,
+        )
+
+        threshold = settings.QUERY_INSTRUMENTATION_SLOW_MS
+        if threshold is not None and view_ms >= threshold:
+            logger.warning(
+                'Slow request %s %s took %.1f ms, queries:\n%s',
+                request.method,
+                request.path,
+                view_ms,
+                '\n'.join(
+                    f'{duration * 1000:.1f} ms: {sql}'
+                    for duration, sql in recorder.queries
+                ),
+                extra=fields,
+            )
+        return response
+
+
+def skip_on_lean_paths(middleware):
+    """Return a subclass of middleware skipped under LEAN_MIDDLEWARE_PATHS.
+
+    Requests whose path starts with one of the prefixes go straight to
+    the next middleware, and the view hooks do nothing for them. Other
+    paths get the middleware unchanged. Being a subclass, it satisfies
+    the admin's checks, which test for subclasses. The security checks
+    match the dotted path instead, which is why CsrfViewMiddleware is
+    not wrapped, and security.W011/W012 for the session cookie do not
+    run (W010 still does).
+    """
+
+    def __init__(self, get_response=None):
+        middleware.__init__(self, get_response)
+        self.lean_paths = tuple(settings.LEAN_MIDDLEWARE_PATHS)
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.lean_paths):
+            return self.get_response(request)
+        return middleware.__call__(self, request)
+
+    def process_view(self, request, *args):
+        if not request.path_info.startswith(self.lean_paths):
+            return middleware.process_view(self, request, *args)
+
+    def process_exception(self, request, exception):
+        if not request.path_info.startswith(self.lean_paths):
+            return middleware.process_exception(self, request, exception)
+
+    def process_template_response(self, request, response):
+        if request.path_info.startswith(self.lean_paths):
+            return response
+        return middleware.process_template_response(self, request, response)
+
+    attrs = {
+        '__module__': __name__,
+        '__doc__': f'{middleware.__name__} skipped for the API paths.',
+        '__init__': __init__,
+        '__call__': __call__,
+    }
+    # Django registers the view hooks a middleware has, only add those.
+    for hook in (process_view, process_exception, process_template_response):
+        if hasattr(middleware, hook.__name__):
+            attrs[hook.__name__] = hook
+    return type(f'Lean{middleware.__name__}', (middleware,), attrs)
+
+
+LeanSessionMiddleware = skip_on_lean_paths(SessionMiddleware)
+LeanAuthenticationMiddleware = skip_on_lean_paths(AuthenticationMiddleware)
+LeanMessageMiddleware = skip_on_lean_paths(MessageMiddleware)
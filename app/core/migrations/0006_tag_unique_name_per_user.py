@@ -0,0 +1,52 @@
+# Generated by Django 3.2.25 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """Fold duplicate (user, name) tags into the oldest one."""
+    Tag = apps.get_model('core', 'Tag')
+    RecipeTag = apps.get_model('core', 'Recipe').tags.through
+    duplicates = Tag.objects.values('user_id', 'name').annotate(
+        keep=Min('id'),
+        count=Count('id'),
+    ).filter(count__gt=1)
+
+    for row in duplicates:
+        extra = Tag.objects.filter(
+            user_id=row['user_id'],
+            name=row['name'],
+        ).exclude(id=row['keep'])
+        recipe_ids = set(
+            RecipeTag.objects.filter(tag__in=extra).values_list(
+                'recipe_id',
+                flat=True,
+            )
+        )
+        RecipeTag.objects.bulk_create(
+            [
+                RecipeTag(recipe_id=recipe_id, tag_id=row['keep'])
+                for recipe_id in recipe_ids
+            ],
+            ignore_conflicts=True,
+        )
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_recipe_ingredients'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        # The deletes queue deferred foreign key checks, which would make
+        # Postgres refuse to alter the table in the same transaction.
+        migrations.RunSQL('SET CONSTRAINTS ALL IMMEDIATE', migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_tag_name_per_user'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.2.25 on 2026-10-17 11:40
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    """Fold duplicate (user, name) ingredients into the oldest one."""
+    Ingredient = apps.get_model('core', 'Ingredient')
+    RecipeIngredient = apps.get_model('core', 'Recipe').ingredients.through
+    duplicates = Ingredient.objects.values('user_id', 'name').annotate(
+        keep=Min('id'),
+        count=Count('id'),
+    ).filter(count__gt=1)
+
+    for row in duplicates:
+        extra = Ingredient.objects.filter(
+            user_id=row['user_id'],
+            name=row['name'],
+        ).exclude(id=row['keep'])
+        recipe_ids = set(
+            RecipeIngredient.objects.filter(ingredient__in=extra).values_list(
+                'recipe_id',
+                flat=True,
+            )
+        )
+        RecipeIngredient.objects.bulk_create(
+            [
+                RecipeIngredient(recipe_id=recipe_id, ingredient_id=row['keep'])
+                for recipe_id in recipe_ids
+            ],
+            ignore_conflicts=True,
+        )
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_tag_unique_name_per_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', '-id'], name='recipe_user_id_desc_idx'),
+        ),
+        migrations.RunPython(merge_duplicate_ingredients, migrations.RunPython.noop),
+        # The deletes queue deferred foreign key checks, which would make
+        # Postgres refuse to alter the table in the same transaction.
+        migrations.RunSQL('SET CONSTRAINTS ALL IMMEDIATE', migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_ingredient_name_per_user'),
+        ),
+    ]
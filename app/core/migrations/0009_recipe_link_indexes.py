@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-17 14:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Index the M2M through tables from the related side.
+
+    Filtering recipes by tags or ingredients looks links up by the
+    related id first; (related_id, recipe_id) lets those lookups run as
+    index-only scans. Built concurrently so writes are not blocked.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS recipe_tags_tag_recipe_idx '
+            'ON core_recipe_tags (tag_id, recipe_id);',
+            'DROP INDEX CONCURRENTLY IF EXISTS recipe_tags_tag_recipe_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS '
+            'recipe_ingredients_ingredient_recipe_idx '
+            'ON core_recipe_ingredients (ingredient_id, recipe_id);',
+            'DROP INDEX CONCURRENTLY IF EXISTS '
+            'recipe_ingredients_ingredient_recipe_idx;',
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:37
+
+from django.db import migrations, models
+
+
+BACKFILL_SQL = """
+UPDATE core_{model} SET recipe_count = links.count
+FROM (
+    SELECT {model}_id, count(*) AS count
+    FROM core_recipe_{model}s GROUP BY {model}_id
+) AS links
+WHERE links.{model}_id = core_{model}.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipe_link_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            BACKFILL_SQL.format(model='ingredient'),
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            BACKFILL_SQL.format(model='tag'),
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'recipe_count', 'name'], name='ingredient_recipe_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'recipe_count', 'name'], name='tag_recipe_count_idx'),
+        ),
+    ]
@@ -1,9 +1,14 @@
 """
 Models for this project.
 """
+from collections import defaultdict
 
 from app.settings import AUTH_USER_MODEL
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -36,6 +41,120 @@ class UserManager(BaseUserManager):
         return user
 
 
+class NamedObjectManager(models.Manager):
+    """Manager for per-user objects identified by their name."""
+    def get_or_create_by_names(self, user, names):
+        """Return a dict mapping each name to an object owned by user.
+
+        Existing objects are looked up in one query and the missing ones
+        are inserted with a single bulk_create. Rows inserted concurrently
+        by another request are ignored on conflict and read back instead.
+        Names are inserted sorted, so requests creating overlapping names
+        lock them in the same order and cannot deadlock.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        objects = {
+            obj.name: obj for obj in self.filter(user=user, name__in=names)
+        }
+        missing = sorted(name for name in names if name not in objects)
+        if missing:
+            self.bulk_create(
+                [self.model(user=user, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            objects.update(
+                (obj.name, obj)
+                for obj in self.filter(user=user, name__in=missing)
+            )
+
+        return objects
+
+    def _recipe_links(self):
+        """Return the through model and its column pointing at this model."""
+        field = self.model._meta.get_field('recipe').field
+        return (
+            field.remote_field.through,
+            field.m2m_reverse_field_name() + '_id',
+        )
+
+    def adjust_recipe_counts(self, deltas):
+        """Apply a mapping of object id to recipe_count change.
+
+        Objects sharing the same change are updated together, so the usual
+        +1/-1 changes cost one UPDATE each whatever the number of objects.
+        The rows are locked in id order first, so requests changing
+        overlapping counters queue up instead of deadlocking.
+        """
+        ids_by_delta = defaultdict(list)
+        for obj_id, delta in deltas.items():
+            if delta:
+                ids_by_delta[delta].append(obj_id)
+        if not ids_by_delta:
+            return
+        with transaction.atomic(using=self.db):
+            locked = self.filter(id__in=[
+                obj_id for ids in ids_by_delta.values() for obj_id in ids
+            ]).order_by('id').select_for_update()
+            list(locked.values_list('id'))
+            for delta, ids in ids_by_delta.items():
+                self.filter(id__in=ids).update(
+                    recipe_count=F('recipe_count') + delta,
+                )
+
+    def release_recipes(self, recipe_ids):
+        """Decrement recipe_count for the links of recipes being deleted."""
+        through, target = self._recipe_links()
+        counts = through.objects.filter(
+            recipe_id__in=recipe_ids,
+        ).order_by().values_list(target).annotate(links=Count('id'))
+        self.adjust_recipe_counts({
+            obj_id: -links for obj_id, links in counts
+        })
+
+    def rebuild_recipe_counts(self, users=None):
+        """Recount recipe_count from the through table.
+
+        Only counters that drifted are written, as a relative change so
+        links written meanwhile are not lost. Returns the (id, user id)
+        pairs of the objects that were fixed.
+        """
+        through, target = self._recipe_links()
+        links = through.objects.filter(
+            **{target: OuterRef('pk')}
+        ).order_by().values(target).annotate(links=Count('id'))
+        queryset = self.all() if users is None else self.filter(user__in=users)
+        drifted = queryset.annotate(
+            actual=Coalesce(Subquery(links.values('links')), 0),
+        ).exclude(recipe_count=F('actual')).values_list(
+            'id', 'user_id', 'recipe_count', 'actual',
+        )
+
+        fixed = []
+        deltas = {}
+        for obj_id, user_id, recipe_count, actual in drifted:
+            fixed.append((obj_id, user_id))
+            deltas[obj_id] = actual - recipe_count
+        self.adjust_recipe_counts(deltas)
+        return fixed
+
+
+class RecipeQuerySet(models.QuerySet):
+    """QuerySet keeping tag and ingredient counters in step with deletes."""
+
+    def release_links(self):
+        """Decrement the counters of everything these recipes link to."""
+        recipe_ids = self.order_by().values('id')
+        for field in self.model._meta.many_to_many:
+            field.related_model.objects.release_recipes(recipe_ids)
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            self.release_links()
+            return super().delete()
+
+
 class User(AbstractBaseUser, PermissionsMixin):
     """Default User Model for the project."""
     email = models.EmailField(max_length=255, unique=True, blank=False)
@@ -43,6 +162,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
 
+    # Signed access tokens carry this version, bumping it revokes them.
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
@@ -61,10 +183,32 @@ class Recipe(models.Model):
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField('Tag')
     ingredients = models.ManyToManyField('Ingredient')
+    # Weighted title (A) and description (B) lexemes, kept up to date by
+    # a database trigger so bulk writes are covered too.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-id'],
+                name='recipe_user_id_desc_idx',
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            Recipe.objects.filter(pk=self.pk).release_links()
+            return super().delete(*args, **kwargs)
+
 
 class Tag(models.Model):
     "Tag object"
@@ -74,6 +218,25 @@ class Tag(models.Model):
         on_delete=models.CASCADE,
     )
 
+    # Number of recipes linked, maintained on every link change.
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NamedObjectManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_tag_name_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'recipe_count', 'name'],
+                name='tag_recipe_count_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -86,5 +249,24 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE,
     )
 
+    # Number of recipes linked, maintained on every link change.
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NamedObjectManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_ingredient_name_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'recipe_count', 'name'],
+                name='ingredient_recipe_count_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.name
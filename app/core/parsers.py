@@ -0,0 +1,38 @@
+"""
+JSON parser using orjson when it is installed.
+"""
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """Parse JSON with orjson, falling back to the stdlib parser.
+
+    Bodies orjson rejects are parsed again by JSONParser, so invalid
+    input gets the same error message either way.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read()
+        try:
+            if encoding.lower().replace('-', '') != 'utf8':
+                return orjson.loads(body.decode(encoding))
+            return orjson.loads(body)
+        except (orjson.JSONDecodeError, UnicodeDecodeError):
+            return super().parse(
+                io.BytesIO(body),
+                media_type,
+                parser_context,
+            )
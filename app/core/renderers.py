@@ -0,0 +1,50 @@
+"""
+JSON renderer using orjson when it is installed.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Render JSON with orjson, falling back to the stdlib renderer.
+
+    Types orjson does not handle the way DRF does, such as Decimal,
+    datetimes and lazy strings, go through the DRF JSONEncoder, so the
+    output matches JSONRenderer. Indented or ASCII-only output, and
+    anything orjson cannot encode such as non-string keys, is left to
+    JSONRenderer.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.options,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape line and paragraph separators like JSONRenderer does, so
+        # the output stays a strict javascript subset. Both start with
+        # 0xe2, which most bodies never contain and is quick to look for.
+        if b'\xe2' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029',
+            )
+        return ret
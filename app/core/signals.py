@@ -0,0 +1,50 @@
+"""
+Signal handlers for the core app.
+"""
+
+from django.db.models import Count
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from core.models import Recipe
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def count_manager_link_changes(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Keep recipe_count right for links changed by related managers.
+
+    The API writes links in bulk and adjusts the counters itself; this
+    covers add/remove/set/clear calls such as the ones made by the admin.
+    Removals are counted before they run so only existing links count.
+    """
+    field = next(
+        field for field in Recipe._meta.many_to_many
+        if field.remote_field.through is sender
+    )
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+
+    if action == 'post_add':
+        if reverse:
+            deltas = {instance.pk: len(pk_set)}
+        else:
+            deltas = dict.fromkeys(pk_set, 1)
+    elif action in ('pre_remove', 'pre_clear'):
+        links = sender.objects.filter(
+            **{(target if reverse else source): instance.pk}
+        )
+        if action == 'pre_remove':
+            links = links.filter(
+                **{(source if reverse else target) + '__in': pk_set}
+            )
+        counts = links.order_by().values_list(
+            target + '_id',
+        ).annotate(links=Count('id'))
+        deltas = {obj_id: -links for obj_id, links in counts}
+    else:
+        return
+
+    field.related_model.objects.adjust_recipe_counts(deltas)
@@ -1,31 +1,523 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.db.models import F
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
+from core.management.commands.wait_for_db import Command
+from core.models import Ingredient, Recipe, Tag
 
-@patch("core.management.commands.wait_for_db.Command.check")
+
+@patch("core.management.commands.wait_for_db.Command.ping")
 class CommandsTest(SimpleTestCase):
     """Test Commands."""
 
-    def test_wait_for_db_ready(self, patched_check):
-        """Test waiting for database if database is ready"""
-        patched_check.return_value = True
+    def _wait(self, *args):
+        """Run wait_for_db quietly and return its stdout."""
+        out = StringIO()
+        call_command("wait_for_db", *args, stdout=out)
+        return out.getvalue()
 
-        call_command("wait_for_db")
+    def test_wait_for_db_ready(self, patched_ping):
+        """Test waiting for database if database is ready"""
+        out = self._wait()
 
-        patched_check.assert_called_once_with(databases=['default'])
+        patched_ping.assert_called_once()
+        self.assertEqual(patched_ping.call_args.args[0], 'default')
+        self.assertIn('Database Available!', out)
 
     @patch("time.sleep")
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    def test_wait_for_db_delay(self, patched_sleep, patched_ping):
         """Test retry for database in case of delay"""
-        patched_check.side_effect = [Psycopg2Error] * 2 \
-            + [OperationalError] * 3 + [True]
+        patched_ping.side_effect = [Psycopg2Error] * 2 \
+            + [OperationalError] * 3 + [None]
+
+        self._wait()
+
+        self.assertEqual(patched_ping.call_count, 6)
+        self.assertEqual(patched_ping.call_args.args[0], 'default')
+
+    @patch("random.uniform", side_effect=lambda low, high: high)
+    @patch("time.sleep")
+    def test_wait_for_db_backoff(self, patched_sleep, patched_uniform,
+                                 patched_ping):
+        """Test the wait doubles between attempts up to --max-interval"""
+        patched_ping.side_effect = [OperationalError] * 5 + [None]
+
+        self._wait('--interval', '0.5', '--max-interval', '3')
+
+        self.assertEqual(
+            [args[0] for args, _ in patched_sleep.call_args_list],
+            [0.5, 1, 2, 3, 3],
+        )
+        patched_uniform.assert_any_call(0.25, 0.5)
+
+    @patch("time.monotonic")
+    @patch("time.sleep")
+    def test_wait_for_db_timeout(self, patched_sleep, patched_monotonic,
+                                 patched_ping):
+        """Test giving up with exit code 1 once --timeout runs out"""
+        patched_ping.side_effect = OperationalError('connection refused')
+        patched_monotonic.side_effect = [100, 101, 104, 106]
+
+        with self.assertRaises(CommandError) as raised:
+            self._wait('--timeout', '5', '--interval', '4')
+
+        self.assertEqual(raised.exception.returncode, 1)
+        self.assertIn('connection refused', str(raised.exception))
+        self.assertEqual(patched_ping.call_count, 3)
+        # The last wait is cut short to end at the deadline.
+        self.assertEqual(patched_sleep.call_args_list[-1].args, (1,))
+        patched_ping.assert_called_with('default', 105)
+
+    @patch("time.monotonic")
+    @patch("time.sleep")
+    def test_wait_for_db_no_timeout(self, patched_sleep, patched_monotonic,
+                                    patched_ping):
+        """Test --timeout 0 gives connection attempts no deadline"""
+        self._wait('--timeout', '0')
+
+        patched_ping.assert_called_once_with('default', None)
+        patched_monotonic.assert_not_called()
+
+    def test_wait_for_db_multiple_databases(self, patched_ping):
+        """Test every --database alias is waited for"""
+        with patch.dict(
+            'django.db.connections.settings',
+            {'replica': {}},
+        ):
+            self._wait('--database', 'default', '--database', 'replica')
+
+        self.assertEqual(
+            [args[0] for args, _ in patched_ping.call_args_list],
+            ['default', 'replica'],
+        )
+
+    def test_wait_for_db_unknown_database(self, patched_ping):
+        """Test an unknown alias fails with exit code 2"""
+        with self.assertRaises(CommandError) as raised:
+            self._wait('--database', 'nope')
+
+        self.assertEqual(raised.exception.returncode, 2)
+        patched_ping.assert_not_called()
+
+
+class WaitForDbPingTests(SimpleTestCase):
+    """Test the connection attempts of wait_for_db."""
+
+    def setUp(self):
+        settings = patch.dict(
+            'django.db.connections.settings',
+            {'probe': dict(connection.settings_dict, OPTIONS={})},
+        )
+        settings.start()
+        self.addCleanup(settings.stop)
+        self.addCleanup(connections.__delitem__, 'probe')
+
+    @patch("time.monotonic", return_value=100)
+    @patch("psycopg2.connect", side_effect=Psycopg2Error('timeout expired'))
+    def test_ping_connect_timeout_ends_at_deadline(self, patched_connect,
+                                                   patched_monotonic):
+        """Test opening a connection is bounded by the time left"""
+        with self.assertRaises(OperationalError):
+            Command().ping('probe', deadline=102.5)
+
+        self.assertEqual(
+            patched_connect.call_args.kwargs['connect_timeout'],
+            3,
+        )
+        self.assertEqual(connections['probe'].settings_dict['OPTIONS'], {})
+
+    @patch("time.monotonic", return_value=100)
+    @patch("psycopg2.connect", side_effect=Psycopg2Error('timeout expired'))
+    def test_ping_connect_timeout_at_least_one_second(self, patched_connect,
+                                                      patched_monotonic):
+        """Test a deadline about to pass still waits one second, not forever"""
+        with self.assertRaises(OperationalError):
+            Command().ping('probe', deadline=100.2)
+
+        self.assertEqual(
+            patched_connect.call_args.kwargs['connect_timeout'],
+            1,
+        )
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test the import_recipes command."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='importer@example.com',
+            password='testpass123',
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _write(self, name, content):
+        """Write a file in the temporary directory and return its path."""
+        path = Path(self.tmpdir.name) / name
+        path.write_text(content, encoding='utf-8')
+        return str(path)
+
+    def _import(self, path, *args):
+        """Run the command quietly and return its stdout."""
+        out = StringIO()
+        call_command(
+            'import_recipes',
+            path,
+            '--user', self.user.email,
+            *args,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        return out.getvalue()
+
+    def test_import_ndjson(self):
+        """Test importing recipes with shared tags and ingredients."""
+        rows = [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': 10,
+                'price': '4.50',
+                'tags': [{'name': 'Dinner'}, {'name': f'Tag {i}'}],
+                'ingredients': ['Salt', 'Pepper'],
+            }
+            for i in range(5)
+        ]
+        path = self._write(
+            'recipes.ndjson',
+            '\n'.join(json.dumps(row) for row in rows),
+        )
+
+        out = self._import(path, '--batch-size', '2', '--commit-every', '1')
+
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 5)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 6)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 2)
+        for recipe in recipes:
+            self.assertEqual(recipe.tags.count(), 2)
+            self.assertEqual(recipe.ingredients.count(), 2)
+        self.assertIn('Imported 5 recipes', out)
+        self.assertEqual(
+            Tag.objects.get(user=self.user, name='Dinner').recipe_count,
+            5,
+        )
+        self.assertEqual(
+            Tag.objects.get(user=self.user, name='Tag 0').recipe_count,
+            1,
+        )
+        self.assertEqual(
+            Ingredient.objects.get(user=self.user, name='Salt').recipe_count,
+            5,
+        )
+
+    def test_import_csv_skips_invalid_rows(self):
+        """Test importing CSV rows and skipping the invalid ones."""
+        path = self._write('recipes.csv', (
+            'title,description,time_minutes,price,link,tags\n'
+            'Soup,Hot,15,3.20,,Lunch|Vegan\n'
+            'Broken,,soon,3.20,,\n'
+            ',,5,1.00,,\n'
+            'Salad,,5,2.00,,Vegan\n'
+        ))
+
+        out = self._import(path)
+
+        recipes = Recipe.objects.filter(user=self.user).order_by('id')
+        self.assertEqual(
+            [recipe.title for recipe in recipes],
+            ['Soup', 'Salad'],
+        )
+        self.assertEqual(
+            sorted(recipes[0].tags.values_list('name', flat=True)),
+            ['Lunch', 'Vegan'],
+        )
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertIn('skipped 2 invalid rows', out)
+
+    def test_import_skips_invalid_names(self):
+        """Test rows with malformed tag or ingredient names are skipped."""
+        valid = {'title': 'Soup', 'time_minutes': 10, 'price': '4.50'}
+        rows = [
+            {**valid, 'tags': 5},
+            {**valid, 'tags': [1, 2]},
+            {**valid, 'tags': ['x' * 300]},
+            {**valid, 'ingredients': [{'title': 'Salt'}]},
+            {**valid, 'tags': [' Lunch ', {'name': 'Vegan'}, '']},
+        ]
+        path = self._write(
+            'recipes.ndjson',
+            '\n'.join(json.dumps(row) for row in rows),
+        )
+
+        out = self._import(path)
+
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(
+            sorted(recipe.tags.values_list('name', flat=True)),
+            ['Lunch', 'Vegan'],
+        )
+        self.assertIn('Imported 1 recipes, skipped 4 invalid rows', out)
+
+    def test_import_unknown_user_error(self):
+        """Test importing for a user that does not exist fails."""
+        path = self._write('recipes.ndjson', '')
+
+        with self.assertRaises(CommandError):
+            call_command('import_recipes', path, '--user', 'no@example.com')
+
+
+class RebuildRecipeCountsCommandTests(TestCase):
+    """Test the rebuild_recipe_counts command."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='counter@example.com',
+            password='testpass123',
+        )
+
+    def _recipe(self, title):
+        return Recipe.objects.create(
+            user=self.user,
+            title=title,
+            time_minutes=5,
+            price='1.00',
+        )
+
+    def test_rebuild_fixes_drifted_counters(self):
+        """Test counters are recounted from the recipe links."""
+        dinner = Tag.objects.create(user=self.user, name='Dinner')
+        unused = Tag.objects.create(user=self.user, name='Unused')
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        for i in range(3):
+            recipe = self._recipe(f'Recipe {i}')
+            recipe.tags.add(dinner)
+            recipe.ingredients.add(salt)
+        Tag.objects.filter(id=dinner.id).update(recipe_count=0)
+        Tag.objects.filter(id=unused.id).update(recipe_count=7)
+
+        out = StringIO()
+        call_command('rebuild_recipe_counts', stdout=out)
+
+        dinner.refresh_from_db()
+        unused.refresh_from_db()
+        salt.refresh_from_db()
+        self.assertEqual(dinner.recipe_count, 3)
+        self.assertEqual(unused.recipe_count, 0)
+        self.assertEqual(salt.recipe_count, 3)
+        self.assertIn('Fixed 2 tag counters', out.getvalue())
+
+    def test_rebuild_limited_to_user(self):
+        """Test --user only rebuilds the counters of that user."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        other_tag = Tag.objects.create(user=other, name='Dinner')
+        Tag.objects.update(recipe_count=4)
+
+        call_command(
+            'rebuild_recipe_counts',
+            '--user', self.user.email,
+            stdout=StringIO(),
+        )
+
+        tag.refresh_from_db()
+        other_tag.refresh_from_db()
+        self.assertEqual(tag.recipe_count, 0)
+        self.assertEqual(other_tag.recipe_count, 4)
+
+    def test_rebuild_unknown_user_error(self):
+        """Test rebuilding for a user that does not exist fails."""
+        with self.assertRaises(CommandError):
+            call_command('rebuild_recipe_counts', '--user', 'no@example.com')
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchApiCommandTests(TestCase):
+    """Test the bench_api command."""
+
+    def _bench(self, *args):
+        """Run a small benchmark and return the JSON report."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = str(Path(tmpdir) / 'bench.json')
+            call_command(
+                'bench_api',
+                '--users', '2',
+                '--recipes', '20',
+                '--tags', '5',
+                '--ingredients', '10',
+                '--requests', '3',
+                '--warmup', '1',
+                '--output', output,
+                *args,
+                stderr=StringIO(),
+            )
+            return json.loads(Path(output).read_text())
+
+    def test_bench_reports_scenarios(self):
+        """Test every scenario is measured and the data rolled back."""
+        report = self._bench()
+
+        self.assertEqual(
+            list(report['scenarios']),
+            ['recipe-list', 'recipe-detail', 'recipe-create',
+             'recipe-update', 'tag-list'],
+        )
+        for result in report['scenarios'].values():
+            self.assertEqual(result['count'], 3)
+            self.assertGreater(result['queries_mean'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(report['options']['recipes'], 20)
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_bench_baseline_regression(self):
+        """Test a run slower than the baseline fails."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as baseline:
+            json.dump(
+                {'scenarios': {'tag-list': {'p50_ms': 0.001}}},
+                baseline,
+            )
+            baseline.flush()
+
+            with self.assertRaises(CommandError):
+                self._bench(
+                    '--scenario', 'tag-list',
+                    '--baseline', baseline.name,
+                )
+
+    def test_bench_requires_data(self):
+        """Test sizes below 1 are rejected before anything is seeded."""
+        for name in ('users', 'recipes', 'tags', 'ingredients', 'requests'):
+            with self.subTest(name=name):
+                with self.assertRaisesMessage(
+                    CommandError,
+                    f'--{name} must be at least 1.',
+                ):
+                    self._bench(f'--{name}', '0')
+
+        self.assertFalse(get_user_model().objects.exists())
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchMiddlewareCommandTests(TestCase):
+    """Test the bench_middleware command."""
+
+    def test_bench_compares_stacks(self):
+        """Test both stacks are measured on the API and admin paths."""
+        out = StringIO()
+        call_command(
+            'bench_middleware',
+            '--requests', '4',
+            '--warmup', '1',
+            '--rounds', '2',
+            stdout=out,
+        )
+
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [result['path'] for result in results],
+            ['/api/recipe/tags/', '/admin/login/'],
+        )
+        for result in results:
+            self.assertEqual(result['full']['count'], 4)
+            self.assertEqual(result['lean']['count'], 4)
+            self.assertIn('p50_saved_ms', result)
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class GenerateDataCommandTests(TestCase):
+    """Test the generate_data command."""
+
+    def _generate(self, *args):
+        """Generate a small dataset and return the new users."""
+        existing = list(get_user_model().objects.values_list('id', flat=True))
+        call_command(
+            'generate_data',
+            '--users', '3',
+            '--recipes', '5',
+            '--tags', '4',
+            '--ingredients', '6',
+            *args,
+            stdout=StringIO(),
+        )
+        return get_user_model().objects.exclude(id__in=existing).order_by('id')
+
+    def _snapshot(self, users):
+        """Return the generated data without its ids."""
+        return [
+            (
+                user.name,
+                list(user.recipe_set.order_by('id').values_list(
+                    'title', 'price', 'time_minutes',
+                )),
+                list(user.tag_set.order_by('id').values_list(
+                    'name', 'recipe_count',
+                )),
+                list(user.ingredient_set.order_by('id').values_list(
+                    'name', 'recipe_count',
+                )),
+            )
+            for user in users
+        ]
+
+    def test_generate_data(self):
+        """Test the rows are consistent with each other."""
+        users = self._generate('--password', 'secret123')
+
+        self.assertEqual(len(users), 3)
+        self.assertTrue(users[0].check_password('secret123'))
+        self.assertEqual(users[0].password, users[1].password)
+        self.assertEqual(Tag.objects.count(), 12)
+        self.assertEqual(Ingredient.objects.count(), 18)
+        self.assertTrue(Recipe.objects.exists())
+        for through, name in (
+            (Recipe.tags.through, 'tag'),
+            (Recipe.ingredients.through, 'ingredient'),
+        ):
+            self.assertTrue(through.objects.exists())
+            self.assertFalse(
+                through.objects.exclude(
+                    **{f'{name}__user': F('recipe__user')}
+                ).exists()
+            )
+        self.assertEqual(Tag.objects.rebuild_recipe_counts(), [])
+        self.assertEqual(Ingredient.objects.rebuild_recipe_counts(), [])
+
+    def test_generate_resets_sequences(self):
+        """Test objects created afterwards get new ids."""
+        users = self._generate()
+
+        tag = Tag.objects.create(user=users[0], name='Created later')
+
+        self.assertEqual(tag.id, Tag.objects.order_by('-id')[1].id + 1)
+
+    def test_generate_deterministic(self):
+        """Test the same seed generates the same data."""
+        first = self._snapshot(self._generate('--seed', '7'))
+        second = self._snapshot(self._generate('--seed', '7'))
+        other = self._snapshot(self._generate('--seed', '8'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
 
-        call_command("wait_for_db")
+    def test_generate_without_copy(self):
+        """Test other databases get the same data with bulk_create."""
+        copied = self._snapshot(self._generate())
+        with patch.object(connection, 'vendor', 'sqlite'):
+            created = self._snapshot(self._generate())
 
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+        self.assertEqual(created, copied)
@@ -0,0 +1,72 @@
+"""
+Tests for the database backend.
+"""
+from unittest.mock import patch
+
+from django.db import connections
+from django.db.utils import InterfaceError
+from django.test import SimpleTestCase
+
+
+class HealthCheckTests(SimpleTestCase):
+    """Test health checks of persistent connections."""
+
+    def _connection(self, health_checks=True):
+        """Return a new persistent connection outside the test case."""
+        connection = connections['default'].copy()
+        connection.settings_dict['CONN_MAX_AGE'] = None
+        connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+        self.addCleanup(connection.close)
+        connection.ensure_connection()
+        return connection
+
+    def _query(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            return cursor.fetchone()
+
+    def test_reconnect_when_connection_dropped(self):
+        """Test a connection dropped between requests is replaced."""
+        connection = self._connection()
+        dropped = connection.connection
+
+        connection.close_if_unusable_or_obsolete()
+        dropped.close()
+
+        self.assertEqual(self._query(connection), (1,))
+        self.assertIsNot(connection.connection, dropped)
+
+    def test_checked_once_per_request(self):
+        """Test only the first query of a request checks the connection."""
+        connection = self._connection()
+        connection.close_if_unusable_or_obsolete()
+
+        with patch.object(
+            connection,
+            'is_usable',
+            wraps=connection.is_usable,
+        ) as patched_is_usable:
+            self._query(connection)
+            self._query(connection)
+
+        patched_is_usable.assert_called_once_with()
+
+    def test_new_connection_not_checked(self):
+        """Test a connection opened in this request is trusted."""
+        connection = self._connection()
+
+        with patch.object(connection, 'is_usable') as patched_is_usable:
+            self._query(connection)
+
+        patched_is_usable.assert_not_called()
+
+    def test_health_checks_disabled(self):
+        """Test a dropped connection fails without health checks."""
+        connection = self._connection(health_checks=False)
+        dropped = connection.connection
+
+        connection.close_if_unusable_or_obsolete()
+        dropped.close()
+
+        with self.assertRaises(InterfaceError):
+            self._query(connection)
@@ -0,0 +1,144 @@
+"""
+Test the list queries are served by their indexes.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.filters import filter_by_related
+from recipe.pagination import RowComparison
+
+
+class ListQueryIndexTests(TestCase):
+    """Test the plans of the per-user list queries."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='testuser@example.com',
+            password='testpass123',
+        )
+        with connection.cursor() as cursor:
+            # The test tables are tiny, so make the planner prove it can
+            # use an index instead of falling back to a sequential scan.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_recipe_list_uses_user_id_index(self):
+        """Test recipes are read in -id order from the composite index."""
+        others = get_user_model().objects.bulk_create([
+            get_user_model()(email=f'other{i}@example.com') for i in range(9)
+        ])
+        Recipe.objects.bulk_create([
+            Recipe(user=user, title='Soup', time_minutes=5, price=1)
+            for user in [self.user, *others]
+            for _ in range(200)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Recipe._meta.db_table}')
+        queryset = Recipe.objects.filter(user=self.user).order_by('-id')
+
+        plan = queryset[:51].explain()
+
+        self.assertIn('recipe_user_id_desc_idx', plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_tag_list_uses_name_index(self):
+        """Test tags are read in name order from the unique index."""
+        self._analyze(Tag)
+        queryset = Tag.objects.filter(user=self.user).order_by('-name')
+
+        plan = queryset[:101].explain()
+
+        self.assertIn('unique_tag_name_per_user', plan)
+        self.assertNotIn('Sort', plan)
+
+    def _analyze(self, model, rows=200):
+        """Give the planner statistics for a table of per-user names."""
+        model.objects.bulk_create(
+            [model(user=self.user, name=f'name {i}') for i in range(rows)]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+    def test_tag_lookup_by_name_uses_name_index(self):
+        """Test resolving tags by name uses the unique index."""
+        self._analyze(Tag)
+        queryset = Tag.objects.filter(user=self.user, name__in=['a', 'b'])
+
+        self.assertIn('unique_tag_name_per_user', queryset.explain())
+
+    def test_ingredient_lookup_by_name_uses_name_index(self):
+        """Test resolving ingredients by name uses the unique index."""
+        self._analyze(Ingredient)
+        queryset = Ingredient.objects.filter(
+            user=self.user,
+            name__in=['a', 'b'],
+        )
+
+        self.assertIn('unique_ingredient_name_per_user', queryset.explain())
+
+    def test_all_tags_filter_uses_link_index(self):
+        """Test matching all tags scans the (tag, recipe) link index."""
+        self._analyze(Tag)
+        tags = list(Tag.objects.filter(user=self.user))
+        recipes = Recipe.objects.bulk_create([
+            Recipe(user=self.user, title='Soup', time_minutes=5, price=1)
+            for _ in range(50)
+        ])
+        RecipeTag = Recipe.tags.through
+        RecipeTag.objects.bulk_create([
+            RecipeTag(recipe_id=recipe.id, tag_id=tag.id)
+            for index, recipe in enumerate(recipes)
+            for tag in tags[index::10]
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {RecipeTag._meta.db_table}')
+        queryset = filter_by_related(
+            Recipe.objects.filter(user=self.user),
+            'tags',
+            [tags[0].id, tags[1].id],
+            match_all=True,
+        )
+
+        self.assertIn('recipe_tags_tag_recipe_idx', queryset.explain())
+
+    def test_any_ingredient_filter_is_semi_join(self):
+        """Test matching any ingredient never multiplies recipe rows."""
+        queryset = filter_by_related(
+            Recipe.objects.filter(user=self.user),
+            'ingredients',
+            [1, 2],
+        )
+
+        plan = queryset.explain()
+        self.assertIn('Semi Join', plan)
+        self.assertNotIn('Unique', plan)
+
+    def test_tag_list_by_recipe_count_uses_count_index(self):
+        """Test ordering used tags by recipe count reads the count index."""
+        self._analyze(Tag)
+        queryset = Tag.objects.filter(
+            user=self.user,
+            recipe_count__gt=0,
+        ).order_by('-recipe_count', '-name')
+
+        plan = queryset[:101].explain()
+
+        self.assertIn('tag_recipe_count_idx', plan)
+        self.assertNotIn('Sort', plan)
+        self.assertNotIn('core_recipe_tags', plan)
+
+    def test_tag_page_by_recipe_count_starts_at_position(self):
+        """Test a later page seeks to its (recipe_count, name) position."""
+        self._analyze(Tag)
+        queryset = Tag.objects.filter(user=self.user).order_by(
+            'recipe_count',
+            'name',
+        ).filter(RowComparison(['recipe_count', 'name'], [0, 'name 5'], '>'))
+
+        plan = queryset[:101].explain()
+
+        self.assertIn('tag_recipe_count_idx', plan)
+        self.assertRegex(plan, r'Index Cond: .*ROW\(recipe_count')
+        self.assertNotIn('Sort', plan)
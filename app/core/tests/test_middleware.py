@@ -0,0 +1,164 @@
+"""
+Tests for the app middleware.
+"""
+import re
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core import checks
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Tag
+
+
+TAGS_URL = reverse('recipe:tag-list')
+
+SERVER_TIMING_RE = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", '
+    r'db-slowest;dur=[\d.]+, view;dur=[\d.]+'
+)
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    """Test the query instrumentation middleware."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='testuser@example.com',
+            password='testpass123',
+        )
+        Tag.objects.create(user=self.user, name='Vegan')
+
+    def _get(self):
+        """Return the response of an authenticated request for tags."""
+        # The client loads the middleware on its first request, after
+        # the settings were overridden.
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(TAGS_URL)
+
+    def test_disabled_by_default(self):
+        """Test no header is added without the setting."""
+        response = self._get()
+
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(QUERY_INSTRUMENTATION=True)
+    def test_server_timing_header(self):
+        """Test the header reports the queries of the request."""
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertLogs('core.middleware', 'INFO') as logs:
+                response = self._get()
+
+        match = SERVER_TIMING_RE.fullmatch(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        self.assertEqual(int(match[1]), len(queries))
+        self.assertGreater(len(queries), 0)
+
+        record, = logs.records
+        self.assertEqual(record.path, TAGS_URL)
+        self.assertEqual(record.status, 200)
+        self.assertEqual(record.queries, len(queries))
+        self.assertIn(f'queries={len(queries)}', record.getMessage())
+
+    @override_settings(
+        QUERY_INSTRUMENTATION=True,
+        QUERY_INSTRUMENTATION_SLOW_MS=0,
+    )
+    def test_slow_request_logs_sql(self):
+        """Test requests over the threshold log their SQL."""
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            self._get()
+
+        record, = logs.records
+        self.assertIn('Slow request GET', record.getMessage())
+        self.assertIn('core_tag', record.getMessage())
+
+    @override_settings(
+        QUERY_INSTRUMENTATION=True,
+        QUERY_INSTRUMENTATION_SLOW_MS=None,
+    )
+    def test_slow_request_logging_disabled(self):
+        """Test no SQL is logged without a threshold."""
+        with self.assertLogs('core.middleware', 'INFO') as logs:
+            self._get()
+
+        self.assertEqual(
+            [record.levelname for record in logs.records],
+            ['INFO'],
+        )
+
+
+class LeanMiddlewareTests(TestCase):
+    """Test the API paths skip the session based middleware."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123',
+        )
+
+    def test_api_skips_session(self):
+        """Test API requests do not run the session middleware."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with patch.object(
+            SessionMiddleware,
+            'process_request',
+        ) as patched_session:
+            response = client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, 200)
+        patched_session.assert_not_called()
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_api_writes_need_no_csrf_token(self):
+        """Test token authenticated API writes pass the CSRF middleware."""
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_authenticate(self.user)
+
+        response = client.post(
+            reverse('recipe:recipe-list'),
+            {'title': 'Soup', 'time_minutes': 5, 'price': '1.00'},
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+    def test_deploy_checks_find_csrf_middleware(self):
+        """Test the security checks see the CSRF middleware."""
+        messages = checks.run_checks(
+            tags=[checks.Tags.security],
+            include_deployment_checks=True,
+        )
+
+        self.assertNotIn('security.W003', [message.id for message in messages])
+
+    def test_admin_keeps_full_stack(self):
+        """Test the admin still logs in with sessions and CSRF checks."""
+        client = Client(enforce_csrf_checks=True)
+        login_url = reverse('admin:login')
+        payload = {
+            'username': self.user.email,
+            'password': 'testpass123',
+        }
+
+        response = client.post(login_url, payload)
+        self.assertEqual(response.status_code, 403)
+
+        client.get(login_url)
+        payload['csrfmiddlewaretoken'] = client.cookies['csrftoken'].value
+        response = client.post(login_url, payload)
+        self.assertEqual(response.status_code, 302)
+
+        response = client.get(reverse('admin:index'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_checks_pass(self):
+        """Test the admin still finds the middleware it needs."""
+        self.assertEqual(checks.run_checks(tags=[checks.Tags.admin]), [])
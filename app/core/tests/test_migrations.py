@@ -0,0 +1,82 @@
+"""
+Tests for the data migrations.
+"""
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MergeDuplicatesMigrationTests(TransactionTestCase):
+    """Test the migrations merging duplicates before adding constraints."""
+
+    def _migrate(self, target):
+        """Migrate core to target and return the historical apps."""
+        executor = MigrationExecutor(connection)
+        executor.migrate([('core', target)])
+        executor.loader.build_graph()
+        return executor.loader.project_state([('core', target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _duplicates(self, apps, model_name, field):
+        """Create two same-named objects linked to one recipe each."""
+        User = apps.get_model('core', 'User')
+        Recipe = apps.get_model('core', 'Recipe')
+        model = apps.get_model('core', model_name)
+        user = User.objects.create(email='user@example.com')
+        objs = [model.objects.create(user=user, name='dup') for _ in range(2)]
+        recipes = [
+            Recipe.objects.create(
+                user=user,
+                title=f'Recipe {i}',
+                time_minutes=5,
+                price='1.00',
+            )
+            for i in range(2)
+        ]
+        getattr(recipes[0], field).add(*objs)
+        getattr(recipes[1], field).add(objs[1])
+        return objs, recipes
+
+    def test_duplicate_tags_merged(self):
+        """Test duplicate tags are folded into the oldest one."""
+        apps = self._migrate('0005_recipe_ingredients')
+        (keep, _), recipes = self._duplicates(apps, 'Tag', 'tags')
+
+        apps = self._migrate('0006_tag_unique_name_per_user')
+
+        Tag = apps.get_model('core', 'Tag')
+        Recipe = apps.get_model('core', 'Recipe')
+        self.assertEqual(list(Tag.objects.values_list('id', flat=True)), [
+            keep.id,
+        ])
+        for recipe in recipes:
+            self.assertEqual(
+                list(Recipe.objects.get(id=recipe.id).tags.all()),
+                [Tag.objects.get(id=keep.id)],
+            )
+
+    def test_duplicate_ingredients_merged(self):
+        """Test duplicate ingredients are folded into the oldest one."""
+        apps = self._migrate('0006_tag_unique_name_per_user')
+        (keep, _), recipes = self._duplicates(
+            apps,
+            'Ingredient',
+            'ingredients',
+        )
+
+        apps = self._migrate('0007_recipe_and_ingredient_indexes')
+
+        Ingredient = apps.get_model('core', 'Ingredient')
+        Recipe = apps.get_model('core', 'Recipe')
+        self.assertEqual(
+            list(Ingredient.objects.values_list('id', flat=True)),
+            [keep.id],
+        )
+        for recipe in recipes:
+            self.assertEqual(
+                list(Recipe.objects.get(id=recipe.id).ingredients.all()),
+                [Ingredient.objects.get(id=keep.id)],
+            )
@@ -2,13 +2,17 @@
 Test for models.
 """
 
+import random
+import threading
+
 from core.models import (
     Recipe,
     Tag,
     Ingredient,
 )
 from decimal import Decimal
-from django.test import TestCase
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
 
 
@@ -96,3 +100,150 @@ class ModelTests(TestCase):
         )
 
         self.assertEqual(str(ingredient), ingredient.name)
+
+    def test_get_or_create_tags_by_names(self):
+        """Test resolving tag names reuses existing tags in bulk."""
+        user = create_user()
+        existing = Tag.objects.create(user=user, name='Vegan')
+
+        with self.assertNumQueries(3):
+            tags = Tag.objects.get_or_create_by_names(
+                user,
+                ['Vegan', 'Dessert', 'Dessert'],
+            )
+
+        self.assertEqual(list(tags), ['Vegan', 'Dessert'])
+        self.assertEqual(tags['Vegan'], existing)
+        self.assertEqual(Tag.objects.filter(user=user).count(), 2)
+
+    def test_recipe_search_vector_maintained(self):
+        """Test the search vector is kept current on every write path."""
+        user = create_user()
+        recipe = Recipe.objects.create(
+            user=user,
+            title='Tomato Soup',
+            time_minutes=5,
+            price=Decimal('1.00'),
+        )
+        Recipe.objects.bulk_create([Recipe(
+            user=user,
+            title='Bulk Curry',
+            time_minutes=5,
+            price=Decimal('1.00'),
+        )])
+
+        matches = Recipe.objects.filter(search_vector='tomato')
+        self.assertEqual(list(matches), [recipe])
+        self.assertTrue(
+            Recipe.objects.filter(search_vector='curry').exists()
+        )
+
+        recipe.title = 'Pea Soup'
+        recipe.save()
+        self.assertFalse(
+            Recipe.objects.filter(search_vector='tomato').exists()
+        )
+
+    def test_recipe_counts_follow_related_managers(self):
+        """Test recipe_count follows add, remove, set, clear and deletes."""
+        user = create_user()
+        recipe = Recipe.objects.create(
+            user=user,
+            title='Soup',
+            time_minutes=10,
+            price=Decimal('2.50'),
+        )
+        lunch = Tag.objects.create(user=user, name='Lunch')
+        vegan = Tag.objects.create(user=user, name='Vegan')
+
+        def counts():
+            return dict(Tag.objects.values_list('name', 'recipe_count'))
+
+        recipe.tags.add(lunch, vegan)
+        recipe.tags.add(lunch)
+        self.assertEqual(counts(), {'Lunch': 1, 'Vegan': 1})
+
+        recipe.tags.remove(vegan)
+        recipe.tags.remove(vegan)
+        self.assertEqual(counts(), {'Lunch': 1, 'Vegan': 0})
+
+        vegan.recipe_set.add(recipe)
+        recipe.tags.set([vegan])
+        self.assertEqual(counts(), {'Lunch': 0, 'Vegan': 1})
+
+        recipe.tags.clear()
+        recipe.tags.add(lunch, vegan)
+        recipe.delete()
+        self.assertEqual(counts(), {'Lunch': 0, 'Vegan': 0})
+
+
+class ConcurrentWriteTests(TransactionTestCase):
+    """Test concurrent writes to shared rows cannot deadlock."""
+
+    def _run_concurrently(self, target, threads=4):
+        """Run target in threads started together, re-raise any error."""
+        barrier = threading.Barrier(threads)
+        errors = []
+
+        def run(index):
+            try:
+                # Connect first so the threads start querying together.
+                connection.ensure_connection()
+                barrier.wait()
+                target(index)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=run, args=(index,))
+            for index in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise errors[0]
+
+    def test_get_or_create_by_names_in_any_order(self):
+        """Test overlapping names created in different orders."""
+        user = create_user()
+        names = [f'tag {i}' for i in range(500)]
+
+        def create(index):
+            shuffled = random.Random(index).sample(names, len(names))
+            with transaction.atomic():
+                Tag.objects.get_or_create_by_names(user, shuffled)
+
+        for _ in range(10):
+            Tag.objects.all().delete()
+            self._run_concurrently(create)
+
+        self.assertEqual(Tag.objects.filter(user=user).count(), len(names))
+
+    def test_adjust_recipe_counts_in_any_order(self):
+        """Test counters moved in opposite directions at the same time."""
+        user = create_user()
+        first, second = (
+            Tag.objects.create(user=user, name=name)
+            for name in ('First', 'Second')
+        )
+        Tag.objects.update(recipe_count=10)
+
+        def swap(index):
+            source, target = (first, second) if index else (second, first)
+            for _ in range(150):
+                with transaction.atomic():
+                    Tag.objects.adjust_recipe_counts({
+                        target.id: 1,
+                        source.id: -1,
+                    })
+
+        self._run_concurrently(swap, threads=2)
+
+        self.assertEqual(
+            list(Tag.objects.values_list('recipe_count', flat=True)),
+            [10, 10],
+        )
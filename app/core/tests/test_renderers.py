@@ -0,0 +1,131 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+import datetime
+import io
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+PAYLOAD = OrderedDict([
+    ('id', 1),
+    ('title', 'Crème brûlée ☕ "quoted"'),
+    ('price', Decimal('12.50')),
+    ('created', datetime.datetime(2024, 3, 8, 17, 18, 1, 123456,
+                                  tzinfo=timezone.utc)),
+    ('naive', datetime.datetime(2024, 3, 8, 17, 18, 1, 5)),
+    ('day', datetime.date(2024, 3, 8)),
+    ('at', datetime.time(17, 18, 1, 250)),
+    ('duration', datetime.timedelta(minutes=90)),
+    ('uuid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+    ('label', gettext_lazy('Recipe')),
+    ('separators', 'line\u2028paragraph\u2029'),
+    ('counts', {1: 'one', 2: 'two'}),
+    ('tags', [{'id': 1, 'name': 'Vegan'}, {'id': 2, 'name': 'Quick'}]),
+    ('ratio', 0.1),
+    ('missing', None),
+    ('empty', []),
+])
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test the orjson renderer."""
+
+    def test_render_matches_json_renderer(self):
+        """Test the output is byte-identical to JSONRenderer."""
+        self.assertEqual(
+            ORJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_render_none_is_empty(self):
+        """Test rendering None gives an empty body."""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_render_indented_falls_back(self):
+        """Test indented output is left to JSONRenderer."""
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            ORJSONRenderer().render(PAYLOAD, media_type),
+            JSONRenderer().render(PAYLOAD, media_type),
+        )
+
+    def test_render_unencodable_falls_back(self):
+        """Test values orjson cannot encode are left to JSONRenderer."""
+        data = {'big': 2 ** 70}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+    @patch('core.renderers.orjson', None)
+    def test_render_without_orjson(self):
+        """Test rendering works when orjson is not installed."""
+        self.assertEqual(
+            ORJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """Test the orjson parser."""
+
+    def _parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(body),
+            'application/json',
+            {'encoding': encoding},
+        )
+
+    def test_parse_matches_json_parser(self):
+        """Test parsing gives the same data as JSONParser."""
+        body = JSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(
+            self._parse(ORJSONParser(), body),
+            self._parse(JSONParser(), body),
+        )
+
+    def test_parse_other_encoding(self):
+        """Test bodies in another declared charset are decoded first."""
+        body = '{"title": "Crème"}'.encode('latin-1')
+
+        data = self._parse(ORJSONParser(), body, encoding='latin-1')
+
+        self.assertEqual(data, {'title': 'Crème'})
+
+    def test_parse_invalid_json_error(self):
+        """Test invalid JSON raises the same error as JSONParser."""
+        body = b'{"title": '
+
+        with self.assertRaises(ParseError) as expected:
+            self._parse(JSONParser(), body)
+        with self.assertRaises(ParseError) as raised:
+            self._parse(ORJSONParser(), body)
+
+        self.assertEqual(
+            str(raised.exception.detail),
+            str(expected.exception.detail),
+        )
+
+    @patch('core.parsers.orjson', None)
+    def test_parse_without_orjson(self):
+        """Test parsing works when orjson is not installed."""
+        self.assertEqual(
+            self._parse(ORJSONParser(), b'{"id": 1}'),
+            {'id': 1},
+        )
@@ -0,0 +1,55 @@
+"""
+Async (ASGI) read endpoints for recipes, tags and ingredients.
+
+Django 3.2 has no async ORM, so each request hands the regular DRF view
+to a worker thread and awaits it. Token authentication, the queries and
+rendering all happen in that thread, so the event loop never blocks and
+a single ASGI worker serves up to ASYNC_VIEW_THREADS requests at once.
+Responses are the same as the synchronous endpoints.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from recipe.views import IngredientViewSet, RecipeViewSet, TagViewSet
+
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEW_THREADS,
+    thread_name_prefix='async-views',
+)
+
+
+def _run_in_worker_thread(view):
+    """Return a coroutine function running view in the thread pool."""
+    def run(request, *args, **kwargs):
+        # Worker threads keep their own connections, close them the way
+        # the request_started/finished signals do for sync requests.
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False, executor=executor)
+
+
+def async_view(viewset, actions, basename):
+    """Return an async view serving actions of viewset."""
+    run = _run_in_worker_thread(viewset.as_view(actions, basename=basename))
+
+    async def view(request, *args, **kwargs):
+        return await run(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
+
+
+recipe_list = async_view(RecipeViewSet, {'get': 'list'}, 'recipe')
+recipe_detail = async_view(RecipeViewSet, {'get': 'retrieve'}, 'recipe')
+tag_list = async_view(TagViewSet, {'get': 'list'}, 'tag')
+ingredient_list = async_view(IngredientViewSet, {'get': 'list'}, 'ingredient')
@@ -0,0 +1,149 @@
+"""
+Per-user response caching for the recipe API.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+
+def get_response_cache():
+    """Return the cache backend used for recipe API responses."""
+    return caches[settings.RECIPE_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'recipe-version:{user_id}'
+
+
+def get_data_version(user_id):
+    """Return the marker for the current state of a user's recipe data.
+
+    Markers are nanosecond timestamps, so a marker that was evicted from
+    the cache comes back with a value that has never been used before.
+    """
+    cache = get_response_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+
+    return version
+
+
+def bump_data_version(user_id):
+    """Mark a user's recipes, tags or ingredients as changed."""
+    get_response_cache().set(_version_key(user_id), time.time_ns(), None)
+
+
+class CachedResponseMixin:
+    """Helpers to serve responses from a per-user cache.
+
+    Responses are keyed on the user, the action, the full request URL and
+    the user's data version, so writes only have to bump the version to
+    make every cached response of that user unreachable.
+    """
+
+    def _response_cache_key(self, request):
+        user_id = request.user.id
+        url = request.build_absolute_uri()
+        digest = hashlib.sha256(
+            f'{self.basename}:{self.action}:{url}'.encode()
+        ).hexdigest()
+        version = get_data_version(user_id)
+        return f'recipe-response:{user_id}:{version}:{digest}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response for the request or run handler."""
+        cache = get_response_cache()
+        key = self._response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RECIPE_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    """Serve list responses from the per-user cache."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Serve retrieve responses from the per-user cache."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
+
+
+class ConditionalResponseMixin:
+    """Helpers to answer conditional GETs from the user's data version.
+
+    The ETag is derived from the data version and the request, so it is
+    known without running a query and a matching If-None-Match gets a
+    304 before the queryset is built. No Last-Modified is sent: it only
+    has a one second resolution, and a client revalidating with
+    If-Modified-Since would miss writes made later in the same second.
+    """
+
+    def _etag(self, request):
+        version = get_data_version(request.user.id)
+        url = request.build_absolute_uri()
+        digest = hashlib.sha256(
+            f'{version}:{self.basename}:{self.action}:{url}:'
+            f'{request.accepted_media_type}'.encode()
+        ).hexdigest()
+        return f'"{digest[:32]}"'
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Return 304 when the client is up to date, else run handler."""
+        etag = self._etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ConditionalListMixin(ConditionalResponseMixin):
+    """Answer conditional list requests."""
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list,
+            request,
+            *args,
+            **kwargs,
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin):
+    """Answer conditional retrieve requests."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
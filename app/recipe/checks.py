@@ -0,0 +1,13 @@
+"""
+System checks for the recipe app.
+"""
+
+from core.checks import warn_if_local_cache
+
+
+# Writes bump the user's data version in this cache, other processes
+# would keep serving their cached responses and 304s.
+check_response_cache_is_shared = warn_if_local_cache(
+    'RECIPE_CACHE_ALIAS',
+    'recipe.W001',
+)
@@ -0,0 +1,70 @@
+"""
+Helpers for streaming a user's recipes out of the database.
+"""
+
+from collections import defaultdict
+from itertools import islice
+
+from core.models import Recipe
+
+
+EXPORT_FIELDS = [
+    'id',
+    'title',
+    'description',
+    'time_minutes',
+    'price',
+    'link',
+]
+
+# Keys of the rows iter_recipe_rows() yields, in order.
+EXPORT_COLUMNS = EXPORT_FIELDS + ['tags', 'ingredients']
+
+
+def _chunks(iterable, size):
+    """Yield lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _related_names(field_name, recipe_ids):
+    """Return {recipe id: [{id, name}, ...]} for field_name in one query."""
+    field = Recipe._meta.get_field(field_name)
+    target = field.m2m_reverse_field_name()
+    links = field.remote_field.through.objects.filter(
+        recipe_id__in=recipe_ids,
+    ).order_by(target + '_id').values_list(
+        'recipe_id',
+        target + '_id',
+        target + '__name',
+    )
+    related = defaultdict(list)
+    for recipe_id, related_id, name in links:
+        related[recipe_id].append({'id': related_id, 'name': name})
+
+    return related
+
+
+def iter_recipe_rows(queryset, chunk_size=2000):
+    """Yield a plain dict per recipe in queryset, tags and ingredients included.
+
+    Recipes are read through a server-side cursor and the tags and the
+    ingredients for each chunk of recipes are loaded with one query each,
+    so memory use is bounded by chunk_size rather than by the number of
+    recipes.
+    """
+    rows = queryset.values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for chunk in _chunks(rows, chunk_size):
+        recipe_ids = [row['id'] for row in chunk]
+        tags = _related_names('tags', recipe_ids)
+        ingredients = _related_names('ingredients', recipe_ids)
+
+        for row in chunk:
+            row['price'] = str(row['price'])
+            row['tags'] = tags[row['id']]
+            row['ingredients'] = ingredients[row['id']]
+            yield row
@@ -0,0 +1,28 @@
+"""
+Filters for the recipe list.
+"""
+
+from django.db.models import Count, Exists, OuterRef
+
+from core.models import Recipe
+
+
+def filter_by_related(queryset, field_name, ids, match_all=False):
+    """Filter recipes linked to any, or all, of ids through field_name.
+
+    Both variants are semi-joins on the through table, so recipes are
+    never multiplied by their links and no DISTINCT is needed.
+    """
+    field = Recipe._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = field.m2m_field_name() + '_id'
+    target = field.m2m_reverse_field_name() + '_id'
+    links = through.objects.filter(**{target + '__in': ids})
+
+    if match_all:
+        matching = links.values(source).annotate(
+            matched=Count(target, distinct=True),
+        ).filter(matched=len(set(ids))).values(source)
+        return queryset.filter(id__in=matching)
+
+    return queryset.filter(Exists(links.filter(**{source: OuterRef('pk')})))
@@ -0,0 +1,181 @@
+"""
+Pagination classes for the recipe API.
+"""
+import json
+
+from django.db import models
+from django.db.models import BooleanField, F, Func, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+def get_page_ordering(view, queryset):
+    """Return the fields a list page of view will be ordered by."""
+    paginator = view.paginator
+    if view.action == 'list' and paginator is not None:
+        return paginator.get_ordering(view.request, queryset, view)
+    return queryset.query.order_by
+
+
+def get_position_fields(view, queryset):
+    """Return the fields cursor positions are read from on a list page.
+
+    These are the names of the page ordering without their direction, and
+    must be loaded on every row the page serves.
+    """
+    return [name.lstrip('-') for name in get_page_ordering(view, queryset)]
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination for recipes, newest first.
+
+    Search results are paged by rank instead, best match first.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        if 'rank' in queryset.query.annotations:
+            return ('-rank', '-id')
+        return super().get_ordering(request, queryset, view)
+
+
+class RowComparison(Func):
+    """Compare the fields of a row to a position, as in (a, b) > (x, y).
+
+    Postgres resolves the comparison as a range of a composite btree
+    index, so keyset pages start at the position whatever the ties.
+    """
+    output_field = BooleanField()
+
+    def __init__(self, fields, position, operator):
+        super().__init__(
+            *(F(field) for field in fields),
+            *(Value(value) for value in position),
+        )
+        self.operator = operator
+
+    def as_sql(self, compiler, connection):
+        sqls, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+        half = len(sqls) // 2
+        return (
+            f'({", ".join(sqls[:half])}) {self.operator} '
+            f'({", ".join(sqls[half:])})',
+            params,
+        )
+
+
+class NameCursorPagination(CursorPagination):
+    """Keyset pagination for tags and ingredients, ordered by name.
+
+    Names are unique per user, so they need no tiebreaker and the pages
+    come straight from the (user, name) unique index. Other orderings,
+    such as by recipe_count, are tied by name in the same direction and
+    the cursor holds both values, so each page is a range read of the
+    (user, recipe_count, name) index however many objects share a count.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = '-name'
+
+    def get_ordering(self, request, queryset, view):
+        first = super().get_ordering(request, queryset, view)[0]
+        if first.lstrip('-') == 'name':
+            return (first,)
+        return (first, '-name' if first.startswith('-') else 'name')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Page on every ordering field instead of the first one only.
+
+        CursorPagination filters on the first field and skips its ties
+        with an offset, which grows with the number of ties. Positions
+        here are unique, so the next page is always at offset 0.
+        """
+        ordering = self.get_ordering(request, queryset, view)
+        if len(ordering) == 1:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = ordering
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor and self.cursor.position
+
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                values = json.loads(position)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            fields = [field.lstrip('-') for field in ordering]
+            if not self._valid_position(queryset.model, fields, values):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(RowComparison(
+                fields,
+                values,
+                '<' if ordering[0].startswith('-') else '>',
+            ))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = None
+        if len(results) > len(self.page):
+            following = self._get_position_from_instance(
+                results[-1],
+                self.ordering,
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = following is not None
+            self.next_position = position
+            self.previous_position = following
+        else:
+            self.has_next = following is not None
+            self.has_previous = position is not None
+            self.next_position = following
+            self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _valid_position(self, model, fields, values):
+        """Return whether values fit the columns of fields, in order."""
+        if not isinstance(values, list) or len(values) != len(fields):
+            return False
+        for name, value in zip(fields, values):
+            field = model._meta.get_field(name)
+            if isinstance(field, (models.IntegerField, models.AutoField)):
+                valid = type(value) is int
+            else:
+                valid = isinstance(value, str)
+            if not valid:
+                return False
+        return True
+
+    def _get_position_from_instance(self, instance, ordering):
+        if len(ordering) == 1:
+            return super()._get_position_from_instance(instance, ordering)
+        return json.dumps([
+            instance[field.lstrip('-')] if isinstance(instance, dict)
+            else getattr(instance, field.lstrip('-'))
+            for field in ordering
+        ])
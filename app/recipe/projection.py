@@ -0,0 +1,232 @@
+"""
+Build list responses straight from database rows.
+
+Serializing model instances runs every field of every row through the
+serializer machinery. For read-only lists the same output can be built
+from values() rows and one grouped query per nested relation, with the
+per-field conversions worked out once per request.
+"""
+
+import decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from recipe.pagination import get_position_fields
+
+
+# Fields whose to_representation returns database values unchanged.
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+
+class Unsupported(Exception):
+    """A serializer field cannot be built from database rows."""
+
+
+def _overrides(field, base):
+    """Return whether field changes base's to_representation."""
+    return type(field).to_representation is not base.to_representation
+
+
+def _decimal_converter(field):
+    """Return a function formatting a Decimal exactly like field does."""
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return '{:f}'.format(
+            value.quantize(exponent, rounding=rounding, context=context)
+        )
+
+    return convert
+
+
+def _converter(field):
+    """Return the function converting a column value for field.
+
+    None means the value is used as is.
+    """
+    for base in PASSTHROUGH_FIELDS:
+        if isinstance(field, base) and not _overrides(field, base):
+            return None
+    if (
+        isinstance(field, serializers.DecimalField)
+        and not _overrides(field, serializers.DecimalField)
+        and getattr(field, 'coerce_to_string', True)
+        and not field.localize
+        and field.decimal_places is not None
+    ):
+        return _decimal_converter(field)
+    return field.to_representation
+
+
+def _model_field(model, field):
+    try:
+        return model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        raise Unsupported(field.field_name)
+
+
+def _compile_fields(serializer, model, nested=True):
+    """Return [(name, column, converter)] for the readable fields.
+
+    Nested many-to-many serializers get a None column and a
+    (model field, compiled child fields) pair as converter.
+    """
+    plan = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        model_field = _model_field(model, field)
+        if isinstance(field, serializers.ListSerializer) and nested:
+            if not model_field.many_to_many:
+                raise Unsupported(field.field_name)
+            child = _compile_fields(
+                field.child,
+                model_field.related_model,
+                nested=False,
+            )
+            plan.append((field.field_name, None, (model_field, child)))
+        elif (
+            isinstance(field, serializers.BaseSerializer)
+            or not model_field.concrete
+            or model_field.many_to_many
+        ):
+            raise Unsupported(field.field_name)
+        else:
+            plan.append((
+                field.field_name,
+                model_field.attname,
+                _converter(field),
+            ))
+
+    return plan
+
+
+def _convert_row(row, fields):
+    """Return the output dict of a row for compiled plain fields."""
+    item = {}
+    for name, column, convert in fields:
+        value = row[column]
+        if convert is not None and value is not None:
+            value = convert(value)
+        item[name] = value
+    return item
+
+
+class RowProjection:
+    """Precompiled plan turning values() rows into a serializer's output.
+
+    Built with `compile()` from a serializer instance, honouring the
+    fields it was narrowed to. Nested many-to-many serializers are loaded
+    with one query per relation, ordered by the related id like the
+    prefetches of the regular path.
+    """
+
+    def __init__(self, model, plan):
+        self.model = model
+        self.plan = plan
+
+    @classmethod
+    def compile(cls, serializer):
+        """Return the projection of serializer, or None if unsupported."""
+        model = serializer.Meta.model
+        try:
+            return cls(model, _compile_fields(serializer, model))
+        except Unsupported:
+            return None
+
+    def values(self, queryset, extra=()):
+        """Return queryset as the values() rows the projection reads."""
+        columns = [self.model._meta.pk.attname]
+        columns += [column for _, column, _ in self.plan if column]
+        columns += [name for name in extra if name not in columns]
+        return queryset.prefetch_related(None).values(*columns)
+
+    def _related(self, model_field, fields, ids):
+        """Return {id: [item, ...]} for a nested relation of rows ids."""
+        through = model_field.remote_field.through
+        source = model_field.m2m_field_name() + '_id'
+        target = model_field.m2m_reverse_field_name()
+        links = through.objects.filter(**{source + '__in': ids}).order_by(
+            target + '_id',
+        ).values(
+            source,
+            target + '_id',
+            *(f'{target}__{column}' for _, column, _ in fields),
+        )
+
+        fields = [
+            (name, f'{target}__{column}', convert)
+            for name, column, convert in fields
+        ]
+        target += '_id'
+        related = {}
+        items = {}
+        for link in links:
+            # Related objects shared by many rows are converted once.
+            item = items.get(link[target])
+            if item is None:
+                item = items[link[target]] = _convert_row(link, fields)
+            related.setdefault(link[source], []).append(item)
+
+        return related
+
+    def represent(self, rows):
+        """Return the serializer output for a list of values() rows."""
+        pk = self.model._meta.pk.attname
+        ids = [row[pk] for row in rows]
+        plan = []
+        for name, column, convert in self.plan:
+            if column is None:
+                convert = self._related(*convert, ids)
+            plan.append((name, column, convert))
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in plan:
+                if column is None:
+                    item[name] = convert.get(row[pk], [])
+                    continue
+                value = row[column]
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+
+        return data
+
+
+class ProjectedListMixin:
+    """Serve list responses from values() rows when enabled.
+
+    Turned on with the RECIPE_FAST_LIST_SERIALIZATION setting. Requests
+    whose serializer cannot be projected use the regular list.
+    """
+
+    def list(self, request, *args, **kwargs):
+        projection = None
+        if settings.RECIPE_FAST_LIST_SERIALIZATION:
+            projection = RowProjection.compile(self.get_serializer())
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = projection.values(
+            queryset,
+            extra=get_position_fields(self, queryset),
+        )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(projection.represent(page))
+
+        return Response(projection.represent(list(rows)))
@@ -0,0 +1,73 @@
+"""
+Renderers for recipe exports.
+"""
+
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class _Echo:
+    """File-like object that hands written lines straight back."""
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render rows as newline-delimited JSON, one document per line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def stream(self, rows, header=None):
+        """Yield one encoded line per row.
+
+        Each line names its own keys, so header is not used.
+        """
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(self.stream(rows)).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """Render rows as CSV with a header line.
+
+    Nested lists of objects, such as tags, are written as their names
+    joined with `list_separator`.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+    list_separator = '|'
+
+    def _cell(self, value):
+        if isinstance(value, list):
+            return self.list_separator.join(item['name'] for item in value)
+        return value
+
+    def stream(self, rows, header=None):
+        """Yield the header line followed by one line per row.
+
+        Without a header the keys of the first row are used, and nothing
+        is written when there are no rows.
+        """
+        writer = csv.writer(_Echo())
+        if header is not None:
+            yield writer.writerow(header)
+        for row in rows:
+            if header is None:
+                header = list(row)
+                yield writer.writerow(header)
+            yield writer.writerow([self._cell(row[key]) for key in header])
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(self.stream(rows)).encode(self.charset)
@@ -0,0 +1,24 @@
+"""
+Full-text search over recipes.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+
+# Must match the configuration used by the search_vector trigger.
+SEARCH_CONFIG = 'english'
+
+
+def search_recipes(queryset, text):
+    """Filter recipes matching text and annotate them with their rank.
+
+    text uses web search syntax: quoted phrases, `or` and `-word`. The
+    rank is cast to double precision so it survives the round trip
+    through a pagination cursor unchanged.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+    )
@@ -2,50 +2,253 @@
 Serializer for the Recipe Model.
 """
 
-from core.models import Recipe, Tag
+from collections import Counter
+
+from core.models import Ingredient, Recipe, Tag
+from django.db import transaction
 from rest_framework import serializers
 
 
-class TagSerializer(serializers.ModelSerializer):
+def _link_related(field_name, links, replace=False):
+    """Link recipes to related objects through the M2M table in bulk.
+
+    `links` maps recipe ids to the ids of the related objects they should
+    carry. New links are written with one insert; with `replace`, links
+    that are no longer listed are removed with one delete.
+
+    Returns a Counter of the change in linked recipes per related id.
+    """
+    field = Recipe._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = field.m2m_field_name() + '_id'
+    target = field.m2m_reverse_field_name() + '_id'
+
+    deltas = Counter()
+    existing = set()
+    if replace:
+        # Lock the recipes so concurrent relinks cannot count a link twice.
+        list(
+            Recipe.objects.select_for_update().filter(
+                id__in=list(links),
+            ).values_list('id')
+        )
+        stale = []
+        rows = through.objects.filter(
+            **{source + '__in': list(links)}
+        ).values_list('id', source, target)
+        for link_id, recipe_id, related_id in rows:
+            if related_id in links[recipe_id]:
+                existing.add((recipe_id, related_id))
+            else:
+                stale.append(link_id)
+                deltas[related_id] -= 1
+        if stale:
+            through.objects.filter(id__in=stale).delete()
+
+    new_links = [
+        through(**{source: recipe_id, target: related_id})
+        for recipe_id, related_ids in links.items()
+        for related_id in related_ids
+        if (recipe_id, related_id) not in existing
+    ]
+    through.objects.bulk_create(new_links, ignore_conflicts=True)
+    deltas.update(getattr(link, target) for link in new_links)
+    return deltas
+
+
+def _link_named(field_name, user, recipe_items, replace=False):
+    """Get or create the tags or ingredients of many recipes and link them.
+
+    `recipe_items` is a list of (recipe, items) pairs, where items is the
+    validated nested data for field_name on that recipe. The recipe_count
+    of every object gaining or losing recipes is adjusted to match.
+    """
+    model = Recipe._meta.get_field(field_name).related_model
+    objects = model.objects.get_or_create_by_names(
+        user,
+        [item['name'] for _, items in recipe_items for item in items],
+    )
+    deltas = _link_related(
+        field_name,
+        {
+            recipe.id: {objects[item['name']].id for item in items}
+            for recipe, items in recipe_items
+        },
+        replace=replace,
+    )
+    model.objects.adjust_recipe_counts(deltas)
+
+
+# Nested many-to-many fields written through _link_named.
+NESTED_FIELDS = ['tags', 'ingredients']
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """Serializer for writing many recipes with bulk queries."""
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """Create recipes with one insert and link their tags/ingredients."""
+        nested = {
+            field_name: [attrs.pop(field_name, []) for attrs in validated_data]
+            for field_name in NESTED_FIELDS
+        }
+        recipes = Recipe.objects.bulk_create(
+            [Recipe(**attrs) for attrs in validated_data]
+        )
+        for field_name, items in nested.items():
+            _link_named(
+                field_name,
+                self.context['request'].user,
+                list(zip(recipes, items)),
+            )
+        return recipes
+
+    @transaction.atomic
+    def update(self, instances, validated_data):
+        """Update recipes with one query and relink nested data if given."""
+        nested = {field_name: [] for field_name in NESTED_FIELDS}
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for field_name in NESTED_FIELDS:
+                items = attrs.pop(field_name, None)
+                if items is not None:
+                    nested[field_name].append((instance, items))
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+
+        if fields:
+            Recipe.objects.bulk_update(instances, fields)
+        for field_name, recipe_items in nested.items():
+            if recipe_items:
+                _link_named(
+                    field_name,
+                    self.context['request'].user,
+                    recipe_items,
+                    replace=True,
+                )
+
+        return instances
+
+
+class SparseFieldsMixin:
+    """Serializer mixin taking a `fields` argument to narrow the output."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class NamedObjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Base serializer for per-user objects identified by name."""
+
+    def validate_name(self, value):
+        """Reject renaming an object to a name the user already has."""
+        if self.instance is not None:
+            model = self.Meta.model
+            clash = model.objects.filter(
+                user=self.instance.user_id,
+                name=value,
+            ).exclude(id=self.instance.id)
+            if clash.exists():
+                raise serializers.ValidationError(
+                    f'A {model._meta.verbose_name} with this name already '
+                    'exists.'
+                )
+
+        return value
+
+
+class IngredientSerializer(NamedObjectSerializer):
+    """Serializer for the Ingredient model."""
+    class Meta:
+        model = Ingredient
+        fields = ['id', 'name', 'recipe_count']
+        read_only_fields = ['id', 'recipe_count']
+
+
+class TagSerializer(NamedObjectSerializer):
     "Serializer for the Tag model."
     class Meta:
         model = Tag
+        fields = ['id', 'name', 'recipe_count']
+        read_only_fields = ['id', 'recipe_count']
+
+
+class RecipeIngredientSerializer(IngredientSerializer):
+    """Serializer for the ingredients embedded in recipes."""
+    class Meta(IngredientSerializer.Meta):
+        fields = ['id', 'name']
+        read_only_fields = ['id']
+
+
+class RecipeTagSerializer(TagSerializer):
+    """Serializer for the tags embedded in recipes."""
+    class Meta(TagSerializer.Meta):
         fields = ['id', 'name']
         read_only_fields = ['id']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for the Recipe model."""
-    tags = TagSerializer(many=True, required=False)
+    tags = RecipeTagSerializer(many=True, required=False)
+    ingredients = RecipeIngredientSerializer(many=True, required=False)
 
     class Meta:
         model = Recipe
-        fields = ['id', 'title', 'time_minutes', 'price', 'link', 'tags']
+        fields = [
+            'id',
+            'title',
+            'time_minutes',
+            'price',
+            'link',
+            'tags',
+            'ingredients',
+        ]
         read_only_fields = ['id']
+        list_serializer_class = RecipeListSerializer
 
-    def _get_or_create_tags(self, tags, recipe):
+    def _get_or_create_tags(self, tags, recipe, replace=False):
         """Handle getting or creating tags as needed."""
         auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tag_obj)
+        _link_named('tags', auth_user, [(recipe, tags)], replace=replace)
+
+    def _get_or_create_ingredients(self, ingredients, recipe, replace=False):
+        """Handle getting or creating ingredients as needed."""
+        auth_user = self.context['request'].user
+        _link_named(
+            'ingredients',
+            auth_user,
+            [(recipe, ingredients)],
+            replace=replace,
+        )
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create a recipe."""
         tags = validated_data.pop('tags', [])
+        ingredients = validated_data.pop('ingredients', [])
         recipe = Recipe.objects.create(**validated_data)
         self._get_or_create_tags(tags, recipe)
+        self._get_or_create_ingredients(ingredients, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update recipe."""
-        tags = validated_data.pop('tags', [])
+        tags = validated_data.pop('tags', None)
+        ingredients = validated_data.pop('ingredients', None)
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            self._get_or_create_tags(tags, instance, replace=True)
+        if ingredients is not None:
+            self._get_or_create_ingredients(
+                ingredients,
+                instance,
+                replace=True,
+            )
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
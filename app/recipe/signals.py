@@ -0,0 +1,32 @@
+"""
+Signal handlers for the recipe app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.caching import bump_data_version
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def bump_owner_data_version(sender, instance, action=None, **kwargs):
+    """Invalidate the owner's cached reads on model level writes.
+
+    This covers writes made outside the API views, such as the admin's.
+    Bulk writes send no signals and bump the version themselves. The bump
+    waits for the commit, so no request can cache the old rows under the
+    new version.
+    """
+    if action is not None and not action.startswith('post_'):
+        return
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bump_data_version(user_id))
@@ -0,0 +1,95 @@
+"""
+Sparse fieldsets for the recipe API reads.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+from recipe.pagination import get_position_fields
+
+
+FIELDS_PARAMETER = OpenApiParameter(
+    'fields',
+    OpenApiTypes.STR,
+    description='Comma separated list of fields to return, all by default.',
+)
+
+
+class SparseFieldsetMixin:
+    """Narrow list and retrieve responses to the `?fields=` subset.
+
+    Only the columns backing the requested fields are selected and only
+    the requested relations are prefetched, so leaving out `description`
+    or `tags` also leaves them out of the SQL.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        """Return the requested field names, or None for every field."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self._parse_sparse_fields()
+        return self._sparse_fields
+
+    def _parse_sparse_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        value = self.request.query_params.get('fields')
+        if value is None:
+            return None
+
+        fields = list(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        available = self.get_serializer_class()().fields
+        unknown = [name for name in fields if name not in available]
+        if not fields or unknown:
+            raise ValidationError({
+                'fields': 'Expected a comma separated list of: '
+                          f'{", ".join(available)}.',
+            })
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+
+        serializer_fields = self.get_serializer_class()().fields
+        model = queryset.model
+        columns = []
+        relations = set()
+        for name in fields:
+            try:
+                model_field = model._meta.get_field(
+                    serializer_fields[name].source,
+                )
+            except FieldDoesNotExist:
+                continue
+            if model_field.many_to_many:
+                relations.add(model_field.name)
+            elif model_field.concrete:
+                columns.append(model_field.attname)
+
+        # Annotations are selected by only() anyway.
+        columns += [
+            name for name in get_position_fields(self, queryset)
+            if name not in queryset.query.annotations
+        ]
+
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_to', lookup).split('__')[0]
+            in relations
+        ]
+        return queryset.prefetch_related(None).prefetch_related(
+            *lookups
+        ).only(*columns)
@@ -0,0 +1,134 @@
+"""
+Test the async recipe read endpoints.
+"""
+import asyncio
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Recipe, Tag
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, TransactionTestCase
+from django.urls import reverse
+
+from recipe import async_views
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+ASYNC_RECIPES_URL = reverse('recipe:async-recipe-list')
+ASYNC_TAGS_URL = reverse('recipe:async-tag-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def async_detail_url(recipe_id):
+    """return the async url to retrieve a recipe"""
+    return reverse('recipe:async-recipe-detail', args=[recipe_id])
+
+
+class AsyncRecipeAPITests(TransactionTestCase):
+    """Test the async endpoints.
+
+    The views query from worker threads with their own connections, so
+    the test data has to be committed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        # Worker threads share these settings. Have them close their
+        # connections so the test database can be dropped at the end.
+        patcher = patch.dict(connection.settings_dict, CONN_MAX_AGE=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(
+            email='testuser@example.com',
+            password='testpass123',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = AsyncClient()
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Tomato Soup',
+            time_minutes=10,
+            price=Decimal('4.50'),
+        )
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+
+    def _get(self, url, data=None):
+        """Return the response of an authenticated async GET."""
+        return self.client.get(
+            url,
+            data,
+            AUTHORIZATION=f'Token {self.token.key}',
+        )
+
+    def test_views_are_coroutines(self):
+        """Test the endpoints are served as async views."""
+        for view in (
+            async_views.recipe_list,
+            async_views.recipe_detail,
+            async_views.tag_list,
+            async_views.ingredient_list,
+        ):
+            self.assertTrue(asyncio.iscoroutinefunction(view))
+
+    async def test_auth_required(self):
+        """Test requests without a valid token are rejected."""
+        response = await AsyncClient().get(ASYNC_RECIPES_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await AsyncClient().get(
+            ASYNC_RECIPES_URL,
+            AUTHORIZATION='Token nope',
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_matches_sync_endpoint(self):
+        """Test the async list returns what the sync list returns."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        expected = client.get(RECIPES_URL, {'search': 'soup'}).json()
+
+        response = asyncio.run(
+            self._get(ASYNC_RECIPES_URL, {'search': 'soup'})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), expected)
+
+    async def test_retrieve_recipe(self):
+        """Test retrieving a recipe and not another user's recipe."""
+        response = await self._get(async_detail_url(self.recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['title'], 'Tomato Soup')
+
+        response = await self._get(async_detail_url(self.recipe.id + 1))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_list_tags(self):
+        """Test listing tags."""
+        response = await self._get(ASYNC_TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['name'] for tag in json.loads(response.content)['results']],
+            ['Lunch'],
+        )
+
+    async def test_concurrent_requests(self):
+        """Test many requests can be in flight at once."""
+        responses = await asyncio.gather(*(
+            self._get(ASYNC_RECIPES_URL, {'page_size': size})
+            for size in range(1, 11)
+        ))
+
+        self.assertEqual(
+            {response.status_code for response in responses},
+            {status.HTTP_200_OK},
+        )
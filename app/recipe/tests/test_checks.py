@@ -0,0 +1,42 @@
+"""
+Test the recipe app system checks.
+"""
+
+from django.core import checks
+from django.test import SimpleTestCase, override_settings
+
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+SHARED = {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'cache',
+}
+
+
+class ResponseCacheCheckTests(SimpleTestCase):
+    """Test the check of the response cache backend."""
+
+    def _warnings(self):
+        return [
+            message.id for message in checks.run_checks(
+                tags=[checks.Tags.caches],
+                include_deployment_checks=True,
+            )
+        ]
+
+    @override_settings(CACHES={'default': LOCMEM})
+    def test_local_memory_cache_warns(self):
+        """Test a per-process cache is reported on deploy checks."""
+        self.assertIn('recipe.W001', self._warnings())
+
+    @override_settings(CACHES={'default': SHARED})
+    def test_shared_cache_passes(self):
+        """Test a cache shared by processes is accepted."""
+        self.assertNotIn('recipe.W001', self._warnings())
+
+    @override_settings(CACHES={'default': LOCMEM})
+    def test_not_checked_outside_deploy(self):
+        """Test development runs are not warned."""
+        messages = checks.run_checks(tags=[checks.Tags.caches])
+
+        self.assertNotIn('recipe.W001', [message.id for message in messages])
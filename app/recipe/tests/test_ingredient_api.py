@@ -0,0 +1,118 @@
+"""
+Test Ingredient APIs
+"""
+
+from core.models import Ingredient
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from recipe.serializers import IngredientSerializer
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+def detail_url(ingredient_id):
+    """return url to retrieve ingredient detail for an ingredient id."""
+    return reverse('recipe:ingredient-detail', args=[ingredient_id])
+
+
+def create_user(email='testuser@example.com', password='userpass123'):
+    """create and return a user object"""
+    return get_user_model().objects.create_user(email, password)
+
+
+class PublicIngredientAPITests(TestCase):
+    """Test unauthenticated API requests."""
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required for retrieving ingredients."""
+        response = self.client.get(INGREDIENTS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateIngredientAPITests(TestCase):
+    """Test authenticated API requests."""
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_list_retrieve_ingredients(self):
+        """Test retrieve ingredients."""
+        Ingredient.objects.create(user=self.user, name='Kale')
+        Ingredient.objects.create(user=self.user, name='Vanilla')
+
+        response = self.client.get(INGREDIENTS_URL)
+
+        ingredients = Ingredient.objects.all().order_by('-name')
+        serializer = IngredientSerializer(ingredients, many=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], serializer.data)
+
+    def test_list_ingredients_for_authenticated_user(self):
+        """Test list of ingredients is limited to authenticated user."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        new_user = create_user(email='user1@example.com', password='pass123')
+        Ingredient.objects.create(user=new_user, name='Pepper')
+
+        response = self.client.get(INGREDIENTS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['id'], ingredient.id)
+
+    def test_list_ingredients_query_count(self):
+        """Test listing ingredients runs a single query for any count."""
+        for i in range(20):
+            Ingredient.objects.create(user=self.user, name=f'Ingredient {i}')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(INGREDIENTS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_update_ingredient(self):
+        """Test update of ingredient object."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Cilantro')
+        payload = {'name': 'Coriander'}
+
+        response = self.client.patch(detail_url(ingredient.id), payload)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ingredient.refresh_from_db()
+        self.assertEqual(ingredient.name, payload['name'])
+
+    def test_update_ingredient_to_existing_name_error(self):
+        """Test renaming onto another ingredient's name is rejected."""
+        Ingredient.objects.create(user=self.user, name='Coriander')
+        ingredient = Ingredient.objects.create(user=self.user, name='Cilantro')
+
+        response = self.client.patch(
+            detail_url(ingredient.id),
+            {'name': 'Coriander'},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_ingredient(self):
+        """Test deletion of ingredient object."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Lettuce')
+
+        response = self.client.delete(detail_url(ingredient.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(
+            Ingredient.objects.filter(user=self.user).exists()
+        )
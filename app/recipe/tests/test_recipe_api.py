@@ -2,13 +2,21 @@
 Test Recipe APIs.
 """
 
-from core.models import Recipe, Tag
+from core.models import Ingredient, Recipe, Tag
 
+import csv
+import io
+import json
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
 from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
 
@@ -17,6 +25,8 @@ from rest_framework.test import APIClient
 
 
 RECIPES_URL = reverse('recipe:recipe-list')
+BULK_URL = reverse('recipe:recipe-bulk')
+EXPORT_URL = reverse('recipe:recipe-export')
 
 
 def create_user(**payload):
@@ -62,6 +72,7 @@ class PrivateRecipeAPITests(TestCase):
     """Test Authorizded access to Recipe API."""
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = create_user(
             email='testuser@example.com',
@@ -78,7 +89,7 @@ class PrivateRecipeAPITests(TestCase):
         recipes = Recipe.objects.all().order_by('-id')
         recipeSerailizer = RecipeSerializer(recipes, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, recipeSerailizer.data)
+        self.assertEqual(response.data['results'], recipeSerailizer.data)
 
     def test_list_recipe_for_authenticated_user(self):
         """Test list of recipes is limited to authenticated user."""
@@ -93,7 +104,7 @@ class PrivateRecipeAPITests(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         recipeSerializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, recipeSerializer.data)
+        self.assertEqual(response.data['results'], recipeSerializer.data)
 
     def test_get_recipe_detail(self):
         recipe = create_recipe(self.user)
@@ -263,6 +274,27 @@ class PrivateRecipeAPITests(TestCase):
             ).exists()
             self.assertTrue(exists)
 
+    def test_recipe_nested_objects_without_recipe_count(self):
+        """Test embedded tags and ingredients only carry id and name."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Lunch')
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        recipe.tags.add(tag)
+        recipe.ingredients.add(ingredient)
+
+        for response in (
+            self.client.get(detail_url(recipe.id)).data,
+            self.client.get(RECIPES_URL).data['results'][0],
+        ):
+            self.assertEqual(
+                response['tags'],
+                [{'id': tag.id, 'name': 'Lunch'}],
+            )
+            self.assertEqual(
+                response['ingredients'],
+                [{'id': ingredient.id, 'name': 'Salt'}],
+            )
+
     def test_create_recipe_with_existing_tags(self):
         """test creating a recipe with existing tags."""
         tag_indian = Tag.objects.create(user=self.user, name='Indian')
@@ -333,3 +365,923 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.tags.count(), 0)
+
+    def test_list_recipes_query_count_independent_of_rows(self):
+        """Test listing recipes with tags runs a fixed number of queries."""
+        for i in range(10):
+            recipe = create_recipe(self.user, title=f'Recipe {i}')
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f'Tag {i}'),
+                Tag.objects.create(user=self.user, name=f'Other Tag {i}'),
+            )
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'Ing {i}'),
+            )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(RECIPES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_get_recipe_detail_query_count(self):
+        """Test retrieving a recipe loads its tags in a single query."""
+        recipe = create_recipe(self.user)
+        recipe.tags.add(
+            Tag.objects.create(user=self.user, name='Dinner'),
+            Tag.objects.create(user=self.user, name='Vegan'),
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['tags']), 2)
+
+    def test_list_recipes_paginated_by_cursor(self):
+        """Test recipes are paged newest first using opaque cursors."""
+        recipes = [create_recipe(self.user, title=f'R{i}') for i in range(3)]
+
+        response = self.client.get(RECIPES_URL, {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+        self.assertNotIn('page=', response.data['next'])
+        self.assertEqual(
+            [r['id'] for r in response.data['results']],
+            [recipes[2].id, recipes[1].id],
+        )
+
+        response = self.client.get(response.data['next'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+        self.assertEqual(
+            [r['id'] for r in response.data['results']],
+            [recipes[0].id],
+        )
+
+    def test_create_recipe_tag_queries_bounded(self):
+        """Test creating a recipe costs the same queries for any tag count."""
+        Tag.objects.create(user=self.user, name='Existing')
+
+        def create_with_tags(count):
+            payload = {
+                'title': f'Recipe with {count} tags',
+                'time_minutes': 5,
+                'price': Decimal('1.00'),
+                'tags': [{'name': 'Existing'}] + [
+                    {'name': f'Tag {count}-{i}'} for i in range(count)
+                ],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    RECIPES_URL,
+                    payload,
+                    format='json',
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(create_with_tags(1), create_with_tags(30))
+        recipe = Recipe.objects.get(title='Recipe with 30 tags')
+        self.assertEqual(recipe.tags.count(), 31)
+
+    def test_create_recipe_with_duplicate_tag_names(self):
+        """Test repeated tag names in a payload create a single tag."""
+        payload = {
+            'title': 'Pancakes',
+            'time_minutes': 10,
+            'price': Decimal('2.00'),
+            'tags': [{'name': 'Breakfast'}, {'name': 'Breakfast'}],
+        }
+
+        response = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=response.data['id'])
+        self.assertEqual(recipe.tags.count(), 1)
+        self.assertEqual(
+            Tag.objects.filter(user=self.user, name='Breakfast').count(),
+            1,
+        )
+
+    def test_update_recipe_keeps_unchanged_tag_links(self):
+        """Test updating tags only touches links that changed."""
+        tag_breakfast = Tag.objects.create(user=self.user, name='Breakfast')
+        tag_lunch = Tag.objects.create(user=self.user, name='Lunch')
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag_breakfast, tag_lunch)
+        through = Recipe.tags.through
+        kept_link = through.objects.get(recipe=recipe, tag=tag_breakfast)
+
+        payload = {'tags': [{'name': 'Breakfast'}, {'name': 'Brunch'}]}
+        res = self.client.patch(detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(tag['name'] for tag in res.data['tags']),
+            ['Breakfast', 'Brunch'],
+        )
+        self.assertTrue(through.objects.filter(id=kept_link.id).exists())
+        self.assertNotIn(tag_lunch, recipe.tags.all())
+
+    def test_partial_update_without_tags_keeps_tags(self):
+        """Test a partial update that omits tags leaves them in place."""
+        tag = Tag.objects.create(user=self.user, name='Dessert')
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag)
+
+        payload = {'title': 'New Title'}
+        res = self.client.patch(detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(tag, recipe.tags.all())
+
+    def test_bulk_create_recipes(self):
+        """Test creating many recipes with tags in one request."""
+        Tag.objects.create(user=self.user, name='Dinner')
+        payload = [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': 10 + i,
+                'price': '4.50',
+                'description': f'Description {i}',
+                'tags': [{'name': 'Dinner'}, {'name': f'Tag {i}'}],
+            }
+            for i in range(3)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item['title'] for item in res.data],
+            ['Recipe 0', 'Recipe 1', 'Recipe 2'],
+        )
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 3)
+        for item in res.data:
+            recipe = recipes.get(id=item['id'])
+            self.assertEqual(recipe.tags.count(), 2)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 4)
+
+    def test_bulk_create_queries_bounded(self):
+        """Test bulk create costs the same queries for any batch size."""
+        def create_batch(size):
+            payload = [
+                {
+                    'title': f'Recipe {size}-{i}',
+                    'time_minutes': 5,
+                    'price': '1.00',
+                    'tags': [{'name': f'Tag {size}-{i}'}],
+                }
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(BULK_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(create_batch(2), create_batch(20))
+
+    def test_bulk_create_invalid_item_writes_nothing(self):
+        """Test a single invalid item rejects the whole batch."""
+        payload = [
+            {'title': 'Valid', 'time_minutes': 5, 'price': '1.00'},
+            {'title': 'Invalid', 'price': '1.00'},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('time_minutes', res.data[1])
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    def test_bulk_partial_update_recipes(self):
+        """Test updating many recipes by id in one request."""
+        recipe1 = create_recipe(self.user, title='First')
+        recipe2 = create_recipe(self.user, title='Second')
+        recipe2.tags.add(Tag.objects.create(user=self.user, name='Old'))
+
+        payload = [
+            {'id': recipe2.id, 'tags': [{'name': 'New'}]},
+            {'id': recipe1.id, 'title': 'First Updated'},
+        ]
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data],
+            [recipe2.id, recipe1.id],
+        )
+        recipe1.refresh_from_db()
+        recipe2.refresh_from_db()
+        self.assertEqual(recipe1.title, 'First Updated')
+        self.assertEqual(recipe2.title, 'Second')
+        self.assertEqual(
+            list(recipe2.tags.values_list('name', flat=True)),
+            ['New'],
+        )
+
+    def test_bulk_update_other_users_recipe_error(self):
+        """Test bulk update rejects ids the user does not own."""
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        recipe = create_recipe(self.user)
+        other_recipe = create_recipe(other_user, title='Other')
+
+        payload = [
+            {'id': recipe.id, 'title': 'Mine'},
+            {'id': other_recipe.id, 'title': 'Theirs'},
+        ]
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        other_recipe.refresh_from_db()
+        self.assertEqual(other_recipe.title, 'Other')
+
+    def test_bulk_delete_recipes(self):
+        """Test deleting many recipes by id in one request."""
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        recipe = create_recipe(self.user)
+        other_recipe = create_recipe(other_user)
+
+        res = self.client.delete(
+            BULK_URL,
+            [recipe.id, other_recipe.id],
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [
+            {'id': recipe.id, 'deleted': True},
+            {'id': other_recipe.id, 'deleted': False},
+        ])
+        self.assertFalse(Recipe.objects.filter(id=recipe.id).exists())
+        self.assertTrue(Recipe.objects.filter(id=other_recipe.id).exists())
+
+    def _export(self, **params):
+        """Request an export and return the response and its body."""
+        response = self.client.get(EXPORT_URL, params)
+        body = b''.join(response.streaming_content).decode()
+        return response, body
+
+    def test_export_recipes_ndjson(self):
+        """Test exporting recipes streams one JSON document per recipe."""
+        recipe = create_recipe(self.user, title='Soup')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+        create_recipe(self.user, title='Salad')
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        create_recipe(other_user, title='Not Mine')
+
+        response, body = self._export()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(
+            response['Content-Type'].startswith('application/x-ndjson')
+        )
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Soup', 'Salad'])
+        self.assertEqual(rows[0]['price'], '3.45')
+        self.assertEqual(rows[0]['description'], recipe.description)
+        self.assertEqual(rows[0]['tags'], [{
+            'id': recipe.tags.get().id,
+            'name': 'Lunch',
+        }])
+        self.assertEqual(rows[1]['tags'], [])
+        self.assertEqual(rows[1]['ingredients'], [])
+
+    def test_export_recipes_csv(self):
+        """Test exporting recipes as CSV with tag names joined."""
+        recipe = create_recipe(self.user, title='Soup')
+        recipe.tags.add(
+            Tag.objects.create(user=self.user, name='Lunch'),
+            Tag.objects.create(user=self.user, name='Vegan'),
+        )
+
+        response, body = self._export(format='csv')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['title'], 'Soup')
+        self.assertEqual(rows[0]['time_minutes'], '10')
+        self.assertEqual(rows[0]['tags'], 'Lunch|Vegan')
+
+    def test_export_no_recipes_csv_has_header(self):
+        """Test an empty CSV export still starts with the header line."""
+        response, body = self._export(format='csv')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(csv.reader(io.StringIO(body))), [[
+            'id',
+            'title',
+            'description',
+            'time_minutes',
+            'price',
+            'link',
+            'tags',
+            'ingredients',
+        ]])
+
+    def test_export_loads_tags_per_chunk(self):
+        """Test export issues one tag query per chunk of recipes."""
+        for i in range(5):
+            recipe = create_recipe(self.user, title=f'Recipe {i}')
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f'T{i}'))
+
+        with patch('recipe.views.RecipeViewSet.export_chunk_size', 2):
+            response = self.client.get(EXPORT_URL)
+            with self.assertNumQueries(7):
+                lines = b''.join(response.streaming_content).splitlines()
+
+        self.assertEqual(len(lines), 5)
+
+    def test_list_recipes_served_from_cache(self):
+        """Test repeated list requests skip the database."""
+        create_recipe(self.user, title='Cached')
+        first = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+
+    def test_recipe_writes_invalidate_cache(self):
+        """Test creating, updating and deleting refresh cached responses."""
+        recipe = create_recipe(self.user, title='First')
+        url = detail_url(recipe.id)
+        self.client.get(RECIPES_URL)
+        self.client.get(url)
+
+        payload = {'title': 'Second', 'time_minutes': 5, 'price': '1.00'}
+        self.client.post(RECIPES_URL, payload)
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(
+            [item['title'] for item in res.data['results']],
+            ['Second', 'First'],
+        )
+
+        self.client.patch(url, {'title': 'First Updated'})
+        res = self.client.get(url)
+        self.assertEqual(res.data['title'], 'First Updated')
+
+        self.client.delete(url)
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tag_rename_invalidates_recipe_cache(self):
+        """Test renaming a tag refreshes cached recipe responses."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        recipe = create_recipe(self.user)
+        recipe.tags.add(tag)
+        url = detail_url(recipe.id)
+        self.client.get(url)
+
+        tag_url = reverse('recipe:tag-detail', args=[tag.id])
+        self.client.patch(tag_url, {'name': 'Supper'})
+        res = self.client.get(url)
+
+        self.assertEqual(res.data['tags'][0]['name'], 'Supper')
+
+    def test_model_writes_invalidate_cache(self):
+        """Test writes outside the API, such as the admin's, refresh it."""
+        recipe = create_recipe(self.user, title='First')
+        url = detail_url(recipe.id)
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.title = 'Renamed'
+            recipe.save()
+        self.assertEqual(self.client.get(url).data['title'], 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.tags.add(Tag.objects.create(user=self.user, name='New'))
+        self.assertEqual(
+            [tag['name'] for tag in self.client.get(url).data['tags']],
+            ['New'],
+        )
+
+    def test_cached_responses_per_user(self):
+        """Test cached responses are never shared between users."""
+        create_recipe(self.user, title='Mine')
+        self.client.get(RECIPES_URL)
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        create_recipe(other_user, title='Theirs')
+
+        self.client.force_authenticate(other_user)
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            [item['title'] for item in res.data['results']],
+            ['Theirs'],
+        )
+
+    def test_list_recipes_not_modified(self):
+        """Test a matching If-None-Match returns 304 without queries."""
+        create_recipe(self.user)
+        res = self.client.get(RECIPES_URL)
+        self.assertIn('ETag', res)
+        self.assertNotIn('Last-Modified', res)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                RECIPES_URL,
+                HTTP_IF_NONE_MATCH=res['ETag'],
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('ETag', res)
+
+    def test_recipe_detail_etag_changes_on_write(self):
+        """Test a write makes the previous ETag stale."""
+        recipe = create_recipe(self.user)
+        url = detail_url(recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        self.client.patch(url, {'title': 'Changed'})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data['title'], 'Changed')
+
+    def test_recipe_etag_depends_on_query(self):
+        """Test different query parameters get different ETags."""
+        create_recipe(self.user)
+
+        first = self.client.get(RECIPES_URL)
+        second = self.client.get(RECIPES_URL, {'page_size': 1})
+
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_list_recipes_if_modified_since_ignored(self):
+        """Test If-Modified-Since never hides a write in the same second."""
+        create_recipe(self.user)
+        res = self.client.get(RECIPES_URL)
+        self.client.post(RECIPES_URL, {
+            'title': 'Second recipe',
+            'time_minutes': 5,
+            'price': '1.00',
+        })
+
+        res = self.client.get(
+            RECIPES_URL,
+            HTTP_IF_MODIFIED_SINCE=http_date(),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_search_recipes_ranked(self):
+        """Test search returns matching recipes, best match first."""
+        in_description = create_recipe(
+            self.user,
+            title='Weeknight Stew',
+            description='Slow cooked with fresh tomatoes.',
+        )
+        in_title = create_recipe(
+            self.user,
+            title='Tomato Soup',
+            description='A quick lunch.',
+        )
+        create_recipe(self.user, title='Pancakes', description='Sweet.')
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        create_recipe(other_user, title='Tomato Salad')
+
+        res = self.client.get(RECIPES_URL, {'search': 'tomato'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [in_title.id, in_description.id],
+        )
+
+    def test_search_recipes_paginated(self):
+        """Test search results can be paged through with cursors."""
+        for i in range(3):
+            create_recipe(self.user, title=f'Curry {i}')
+
+        res = self.client.get(RECIPES_URL, {'search': 'curry', 'page_size': 2})
+        ids = [item['id'] for item in res.data['results']]
+        res = self.client.get(res.data['next'])
+        ids += [item['id'] for item in res.data['results']]
+
+        self.assertIsNone(res.data['next'])
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), 3)
+
+    def test_filter_recipes_by_any_tag(self):
+        """Test filtering recipes carrying any of the given tags."""
+        tag_vegan = Tag.objects.create(user=self.user, name='Vegan')
+        tag_quick = Tag.objects.create(user=self.user, name='Quick')
+        vegan = create_recipe(self.user, title='Vegan Curry')
+        vegan.tags.add(tag_vegan)
+        both = create_recipe(self.user, title='Quick Vegan Salad')
+        both.tags.add(tag_vegan, tag_quick)
+        create_recipe(self.user, title='Steak')
+
+        res = self.client.get(
+            RECIPES_URL,
+            {'tags': f'{tag_vegan.id},{tag_quick.id}'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [both.id, vegan.id],
+        )
+
+    def test_filter_recipes_by_all_tags(self):
+        """Test filtering recipes carrying all of the given tags."""
+        tag_vegan = Tag.objects.create(user=self.user, name='Vegan')
+        tag_quick = Tag.objects.create(user=self.user, name='Quick')
+        vegan = create_recipe(self.user, title='Vegan Curry')
+        vegan.tags.add(tag_vegan)
+        both = create_recipe(self.user, title='Quick Vegan Salad')
+        both.tags.add(tag_vegan, tag_quick)
+
+        res = self.client.get(RECIPES_URL, {
+            'tags': f'{tag_vegan.id},{tag_quick.id}',
+            'match': 'all',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [both.id],
+        )
+
+    def test_filter_recipes_by_ingredients(self):
+        """Test filtering recipes by ingredient IDs."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        salted = create_recipe(self.user, title='Chips')
+        salted.ingredients.add(ingredient)
+        create_recipe(self.user, title='Fruit Salad')
+
+        res = self.client.get(RECIPES_URL, {'ingredients': ingredient.id})
+
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [salted.id],
+        )
+
+    def test_filter_recipes_invalid_ids_error(self):
+        """Test non-numeric filter IDs are rejected."""
+        res = self.client.get(RECIPES_URL, {'tags': '1,abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_recipe_with_new_ingredients(self):
+        """Test creating a recipe with new ingredients."""
+        payload = {
+            'title': 'Cauliflower Tacos',
+            'time_minutes': 60,
+            'price': Decimal('4.30'),
+            'ingredients': [{'name': 'Cauliflower'}, {'name': 'Salt'}],
+        }
+
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.ingredients.count(), 2)
+        for ingredient in payload['ingredients']:
+            exists = recipe.ingredients.filter(
+                name=ingredient['name'],
+                user=self.user,
+            ).exists()
+            self.assertTrue(exists)
+
+    def test_create_recipe_with_existing_ingredient(self):
+        """Test creating a recipe reuses an existing ingredient."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Lemon')
+        payload = {
+            'title': 'Vietnamese Soup',
+            'time_minutes': 25,
+            'price': '2.55',
+            'ingredients': [{'name': 'Lemon'}, {'name': 'Fish Sauce'}],
+        }
+
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.ingredients.count(), 2)
+        self.assertIn(ingredient, recipe.ingredients.all())
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(),
+            2,
+        )
+
+    def test_create_recipe_ingredient_queries_bounded(self):
+        """Test creating a recipe costs the same for any ingredient count."""
+        def create_with_ingredients(count):
+            payload = {
+                'title': f'Recipe with {count} ingredients',
+                'time_minutes': 5,
+                'price': '1.00',
+                'ingredients': [
+                    {'name': f'Ingredient {count}-{i}'} for i in range(count)
+                ],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(RECIPES_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(
+            create_with_ingredients(1),
+            create_with_ingredients(25),
+        )
+
+    def test_update_recipe_ingredients(self):
+        """Test replacing the ingredients of a recipe."""
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        recipe = create_recipe(self.user)
+        recipe.ingredients.add(salt)
+
+        payload = {'ingredients': [{'name': 'Pepper'}]}
+        res = self.client.patch(detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['name'] for item in res.data['ingredients']],
+            ['Pepper'],
+        )
+        self.assertNotIn(salt, recipe.ingredients.all())
+
+    def test_clear_recipe_ingredients(self):
+        """Test clearing the ingredients of a recipe."""
+        recipe = create_recipe(self.user)
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Garlic'),
+        )
+
+        payload = {'ingredients': []}
+        res = self.client.patch(detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(recipe.ingredients.count(), 0)
+
+    def test_bulk_create_recipes_with_ingredients(self):
+        """Test bulk create resolves ingredients across the batch."""
+        payload = [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': 5,
+                'price': '1.00',
+                'ingredients': [{'name': 'Salt'}, {'name': f'Herb {i}'}],
+            }
+            for i in range(3)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        for item in res.data:
+            self.assertEqual(len(item['ingredients']), 2)
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(),
+            4,
+        )
+
+    def test_recipe_counts_follow_recipe_writes(self):
+        """Test tag and ingredient recipe counts track link changes."""
+        payload = {
+            'title': 'Pancakes',
+            'time_minutes': 20,
+            'price': '3.00',
+            'tags': [{'name': 'Breakfast'}, {'name': 'Sweet'}],
+            'ingredients': [{'name': 'Flour'}],
+        }
+        first = self.client.post(RECIPES_URL, payload, format='json')
+        self.client.post(RECIPES_URL, payload, format='json')
+
+        def counts(model):
+            return dict(
+                model.objects.filter(user=self.user).values_list(
+                    'name',
+                    'recipe_count',
+                )
+            )
+
+        self.assertEqual(counts(Tag), {'Breakfast': 2, 'Sweet': 2})
+        self.assertEqual(counts(Ingredient), {'Flour': 2})
+
+        self.client.patch(
+            detail_url(first.data['id']),
+            {'tags': [{'name': 'Breakfast'}, {'name': 'Savoury'}]},
+            format='json',
+        )
+        self.assertEqual(
+            counts(Tag),
+            {'Breakfast': 2, 'Sweet': 1, 'Savoury': 1},
+        )
+
+        self.client.delete(detail_url(first.data['id']))
+        self.assertEqual(
+            counts(Tag),
+            {'Breakfast': 1, 'Sweet': 1, 'Savoury': 0},
+        )
+        self.assertEqual(counts(Ingredient), {'Flour': 1})
+
+    def test_recipe_counts_follow_bulk_writes(self):
+        """Test bulk writes adjust recipe counts once per change."""
+        payload = [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': 5,
+                'price': '1.00',
+                'tags': [{'name': 'Quick'}],
+            }
+            for i in range(4)
+        ]
+        res = self.client.post(BULK_URL, payload, format='json')
+        ids = [item['id'] for item in res.data]
+        tag = Tag.objects.get(user=self.user, name='Quick')
+        self.assertEqual(tag.recipe_count, 4)
+
+        self.client.patch(
+            BULK_URL,
+            [{'id': recipe_id, 'tags': []} for recipe_id in ids[:2]],
+            format='json',
+        )
+        tag.refresh_from_db()
+        self.assertEqual(tag.recipe_count, 2)
+
+        self.client.delete(BULK_URL, ids[2:], format='json')
+        tag.refresh_from_db()
+        self.assertEqual(tag.recipe_count, 0)
+
+    def test_list_recipes_sparse_fields(self):
+        """Test ?fields= narrows both the response and the SQL."""
+        recipe = create_recipe(self.user, description='Long text.')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'id': recipe.id, 'title': recipe.title}],
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"price"', queries[0]['sql'])
+        self.assertNotIn('"description"', queries[0]['sql'])
+
+    def test_list_recipes_sparse_fields_with_tags(self):
+        """Test only the requested relations are prefetched."""
+        recipe = create_recipe(self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Salt'),
+        )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL, {'fields': 'title,tags'})
+
+        self.assertEqual(list(res.data['results'][0]), ['title', 'tags'])
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'Vegan')
+
+    def test_search_recipes_sparse_fields_paginated(self):
+        """Test sparse search results can still be paged by rank."""
+        for i in range(3):
+            create_recipe(self.user, title=f'Curry {i}')
+
+        res = self.client.get(
+            RECIPES_URL,
+            {'search': 'curry', 'page_size': 2, 'fields': 'title'},
+        )
+        titles = [item['title'] for item in res.data['results']]
+        res = self.client.get(res.data['next'])
+        titles += [item['title'] for item in res.data['results']]
+
+        self.assertEqual(sorted(titles), ['Curry 0', 'Curry 1', 'Curry 2'])
+
+    def test_get_recipe_detail_sparse_fields(self):
+        """Test ?fields= on the detail view can pick the description."""
+        recipe = create_recipe(self.user, description='Long text.')
+
+        res = self.client.get(
+            detail_url(recipe.id),
+            {'fields': 'id,description'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {'id': recipe.id, 'description': 'Long text.'},
+        )
+
+    def test_sparse_fields_unknown_field_error(self):
+        """Test asking for fields the list does not have is rejected."""
+        res = self.client.get(RECIPES_URL, {'fields': 'id,description'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_sparse_fields_ignored_on_writes(self):
+        """Test ?fields= does not narrow the data accepted on create."""
+        payload = {'title': 'Soup', 'time_minutes': 5, 'price': '1.00'}
+
+        res = self.client.post(f'{RECIPES_URL}?fields=id', payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['title'], 'Soup')
+
+
+class FastListRecipeAPITests(TestCase):
+    """Test the recipe list built from values() rows."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='testuser@example.com',
+            password='testuser123'
+        )
+        self.client.force_authenticate(self.user)
+
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        quick = Tag.objects.create(user=self.user, name='Quick «fast»')
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        for i, price in enumerate(['3.45', '0.50', '12.00', '999.99']):
+            recipe = create_recipe(
+                self.user,
+                title=f'Tomato recipe {i} ☕',
+                price=Decimal(price),
+                link='' if i % 2 else f'http://example.com/{i}',
+            )
+            if i % 2:
+                recipe.tags.add(quick, vegan)
+                recipe.ingredients.add(salt)
+        self.tag_id = quick.id
+
+    def _both_paths(self, params, url=RECIPES_URL):
+        """Return the list response bodies of the regular and fast path."""
+        bodies = []
+        for enabled in (False, True):
+            cache.clear()
+            with self.settings(RECIPE_FAST_LIST_SERIALIZATION=enabled):
+                res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            bodies.append(res.content)
+        return bodies
+
+    def test_fast_list_byte_identical(self):
+        """Test the fast path renders exactly the serializer output."""
+        for params in (
+            {},
+            {'page_size': 2},
+            {'fields': 'id,price,tags'},
+            {'fields': 'title'},
+            {'search': 'tomato'},
+            {'tags': str(self.tag_id)},
+        ):
+            with self.subTest(params=params):
+                regular, fast = self._both_paths(params)
+                self.assertEqual(regular, fast)
+
+    def test_fast_list_next_page_byte_identical(self):
+        """Test cursors from the fast path page the same way."""
+        first_page = json.loads(self._both_paths({'page_size': 3})[1])
+
+        regular, fast = self._both_paths({}, url=first_page['next'])
+
+        self.assertEqual(regular, fast)
+        self.assertEqual(len(json.loads(fast)['results']), 1)
+
+    @override_settings(RECIPE_FAST_LIST_SERIALIZATION=True)
+    def test_fast_list_query_count(self):
+        """Test the fast path reads rows and one query per relation."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data['results']), 4)
+        self.assertEqual(len(queries), 3)
+        # Only the listed columns are read, not the description.
+        self.assertNotIn('"description"', queries[0]['sql'])
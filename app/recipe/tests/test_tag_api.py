@@ -1,11 +1,16 @@
 """
 Test Tag APIs
 """
+import json
+from base64 import b64encode
+from urllib.parse import urlencode
 
-from core.models import Tag
+from core.models import Recipe, Tag
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from recipe.serializers import TagSerializer
@@ -27,6 +32,18 @@ def create_user(email='testuser@example.com', password='userpass123'):
     return get_user_model().objects.create_user(email, password)
 
 
+def create_recipe(user, tags):
+    """create and return a recipe carrying the given tags"""
+    recipe = Recipe.objects.create(
+        user=user,
+        title='Sample recipe',
+        time_minutes=5,
+        price='1.00',
+    )
+    recipe.tags.add(*tags)
+    return recipe
+
+
 class PrivateTagAPITests(TestCase):
     """Test unauthenticated API requests."""
     def setUp(self):
@@ -57,7 +74,7 @@ class PublicTagAPITests(TestCase):
         tagSerializer = TagSerializer(tags, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, tagSerializer.data)
+        self.assertEqual(response.data['results'], tagSerializer.data)
 
     def test_list_tags_for_authenticated_user(self):
         """Test list of Tags for authenticated user"""
@@ -72,7 +89,38 @@ class PublicTagAPITests(TestCase):
         tagSerializer = TagSerializer(tags, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, tagSerializer.data)
+        self.assertEqual(response.data['results'], tagSerializer.data)
+
+    def test_list_tags_paginated_by_cursor(self):
+        """Test tags are paged by name using opaque cursors."""
+        for name in ['Vegan', 'Dessert', 'Breakfast']:
+            Tag.objects.create(user=self.user, name=name)
+
+        response = self.client.get(TAGS_URL, {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t['name'] for t in response.data['results']],
+            ['Vegan', 'Dessert'],
+        )
+
+        response = self.client.get(response.data['next'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(
+            [t['name'] for t in response.data['results']],
+            ['Breakfast'],
+        )
+
+    def test_list_tags_not_modified(self):
+        """Test tag list answers If-None-Match with 304."""
+        Tag.objects.create(user=self.user, name='Vegan')
+        etag = self.client.get(TAGS_URL)['ETag']
+
+        response = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
 
     def test_update_tags(self):
         """Test update of tag object."""
@@ -86,6 +134,18 @@ class PublicTagAPITests(TestCase):
         tag.refresh_from_db()
         self.assertEqual(payload['name'], tag.name)
 
+    def test_update_tag_to_existing_name_error(self):
+        """Test renaming a tag onto another tag's name is rejected."""
+        Tag.objects.create(user=self.user, name='Dessert')
+        tag = Tag.objects.create(user=self.user, name='After Dinner')
+
+        url = detail_url(tag.id)
+        response = self.client.patch(url, {'name': 'Dessert'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'After Dinner')
+
     def test_delete_tags(self):
         """Test deletion of tag object."""
         tag_name = 'Breakfast'
@@ -97,3 +157,128 @@ class PublicTagAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         tags = Tag.objects.filter(user=self.user, name=tag_name)
         self.assertFalse(tags.exists())
+
+    def test_filter_tags_assigned_to_recipes(self):
+        """Test listing only tags assigned to recipes."""
+        breakfast = Tag.objects.create(user=self.user, name='Breakfast')
+        Tag.objects.create(user=self.user, name='Lunch')
+        create_recipe(self.user, [breakfast])
+
+        response = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(t['name'], t['recipe_count']) for t in response.data['results']],
+            [('Breakfast', 1)],
+        )
+
+    def test_filter_tags_assigned_only_invalid_error(self):
+        """Test assigned_only only accepts 0 or 1."""
+        response = self.client.get(TAGS_URL, {'assigned_only': 'yes'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_tags_ordered_by_recipe_count(self):
+        """Test tags are paged by recipe count, tied by name."""
+        dinner = Tag.objects.create(user=self.user, name='Dinner')
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        quick = Tag.objects.create(user=self.user, name='Quick')
+        Tag.objects.create(user=self.user, name='Unused')
+        create_recipe(self.user, [dinner, vegan, quick])
+        create_recipe(self.user, [dinner, quick])
+        create_recipe(self.user, [dinner])
+
+        response = self.client.get(
+            TAGS_URL,
+            {'ordering': '-recipe_count', 'page_size': 2},
+        )
+        names = [t['name'] for t in response.data['results']]
+        response = self.client.get(response.data['next'])
+        names += [t['name'] for t in response.data['results']]
+
+        self.assertEqual(names, ['Dinner', 'Quick', 'Vegan', 'Unused'])
+
+    def test_list_tags_by_recipe_count_pages_ties_by_keyset(self):
+        """Test tags sharing a count are paged without an OFFSET."""
+        Tag.objects.bulk_create(
+            [Tag(user=self.user, name=f'Tag {i:02}') for i in range(25)]
+        )
+        names = []
+        url, params = TAGS_URL, {'ordering': 'recipe_count', 'page_size': 10}
+
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('OFFSET', queries[-1]['sql'])
+            names += [t['name'] for t in response.data['results']]
+            url, params = response.data['next'], None
+
+        self.assertEqual(names, [f'Tag {i:02}' for i in range(25)])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(
+            [t['name'] for t in response.data['results']],
+            [f'Tag {i:02}' for i in range(10, 20)],
+        )
+
+    def test_list_tags_by_recipe_count_invalid_cursor(self):
+        """Test cursors with values of the wrong type are rejected."""
+        for position in (['x', 'y'], [0, None], [True, 'a'], [0], 'x'):
+            cursor = b64encode(urlencode({
+                'p': json.dumps(position),
+            }).encode()).decode()
+
+            response = self.client.get(
+                TAGS_URL,
+                {'ordering': 'recipe_count', 'cursor': cursor},
+            )
+
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_404_NOT_FOUND,
+                position,
+            )
+
+    def test_list_tags_by_recipe_count_query_count(self):
+        """Test ordering by recipe count never reads the recipe links."""
+        for i in range(5):
+            create_recipe(
+                self.user,
+                [Tag.objects.create(user=self.user, name=f'Tag {i}')],
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                TAGS_URL,
+                {'ordering': 'recipe_count', 'assigned_only': 1},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('core_recipe_tags', queries[0]['sql'])
+
+    def test_list_tags_sparse_fields(self):
+        """Test ?fields= narrows the tag list, ordering by any field."""
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        dessert = Tag.objects.create(user=self.user, name='Dessert')
+        create_recipe(self.user, [dessert])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                TAGS_URL,
+                {'fields': 'id', 'ordering': '-recipe_count'},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'],
+            [{'id': dessert.id}, {'id': vegan.id}],
+        )
+
+    def test_list_tags_sparse_fields_unknown_error(self):
+        """Test asking for unknown tag fields is rejected."""
+        response = self.client.get(TAGS_URL, {'fields': 'id,title'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -5,7 +5,8 @@ from django.urls import (
     include,
 )
 
-from recipe.views import RecipeViewSet, TagViewSet
+from recipe import async_views
+from recipe.views import IngredientViewSet, RecipeViewSet, TagViewSet
 
 from rest_framework.routers import DefaultRouter
 
@@ -14,9 +15,26 @@ router = DefaultRouter()
 
 router.register('recipes', RecipeViewSet)
 router.register('tags', TagViewSet)
+router.register('ingredients', IngredientViewSet)
 
 app_name = 'recipe'
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    path(
+        'async/recipes/',
+        async_views.recipe_list,
+        name='async-recipe-list',
+    ),
+    path(
+        'async/recipes/<int:pk>/',
+        async_views.recipe_detail,
+        name='async-recipe-detail',
+    ),
+    path('async/tags/', async_views.tag_list, name='async-tag-list'),
+    path(
+        'async/ingredients/',
+        async_views.ingredient_list,
+        name='async-ingredient-list',
+    ),
 ]
@@ -2,32 +2,156 @@
 Views for recipe API.
 """
 
-from core.models import Recipe, Tag
+from core.models import Ingredient, Recipe, Tag
 
+from recipe.caching import (
+    CachedListMixin,
+    CachedRetrieveMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    bump_data_version,
+)
+from recipe.export import EXPORT_COLUMNS, iter_recipe_rows
+from recipe.filters import filter_by_related
+from recipe.pagination import (
+    NameCursorPagination,
+    RecipeCursorPagination,
+)
+from recipe.projection import ProjectedListMixin
+from recipe.renderers import CSVRenderer, NDJSONRenderer
+from recipe.search import search_recipes
+from recipe.sparse import FIELDS_PARAMETER, SparseFieldsetMixin
 from recipe.serializers import (
+    IngredientSerializer,
     RecipeSerializer,
     RecipeDetailSerializer,
     TagSerializer,
 )
 
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+)
+
 from rest_framework import (
+    filters,
     viewsets,
     mixins,
+    status,
 )
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from user.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'search',
+                OpenApiTypes.STR,
+                description='Full-text search over title and description, '
+                            'best matches first.',
+            ),
+            OpenApiParameter(
+                'tags',
+                OpenApiTypes.STR,
+                description='Comma separated list of tag IDs to filter.',
+            ),
+            OpenApiParameter(
+                'ingredients',
+                OpenApiTypes.STR,
+                description='Comma separated list of ingredient IDs to '
+                            'filter.',
+            ),
+            OpenApiParameter(
+                'match',
+                OpenApiTypes.STR,
+                enum=['any', 'all'],
+                description='Whether recipes must carry any (default) or '
+                            'all of the given tags and ingredients.',
+            ),
+            FIELDS_PARAMETER,
+        ]
+    ),
+    retrieve=extend_schema(parameters=[FIELDS_PARAMETER]),
+)
+class RecipeViewSet(
+    SparseFieldsetMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    ProjectedListMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet for the Recipe Model"""
     serializer_class = RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+    bulk_max_items = 1000
+    export_chunk_size = 2000
+
+    def _params_to_ints(self, name):
+        """Convert a comma separated query parameter to a list of ints."""
+        value = self.request.query_params.get(name, '')
+        try:
+            return [int(str_id) for str_id in value.split(',') if str_id]
+        except ValueError:
+            raise ValidationError({name: 'Expected comma separated IDs.'})
 
     def get_queryset(self):
         """retrieve all recipe objects of an authenticated user"""
-        return Recipe.objects.filter(user=self.request.user).order_by("-id")
+        queryset = Recipe.objects.filter(
+            user=self.request.user
+        ).prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.order_by('id')),
+            Prefetch(
+                'ingredients',
+                queryset=Ingredient.objects.order_by('id'),
+            ),
+        ).order_by("-id")
+        if self.action != 'list':
+            return queryset
+
+        params = self.request.query_params
+        match = params.get('match', 'any')
+        if match not in ('any', 'all'):
+            raise ValidationError({'match': 'Expected "any" or "all".'})
+        for field_name in ('tags', 'ingredients'):
+            ids = self._params_to_ints(field_name)
+            if ids:
+                queryset = filter_by_related(
+                    queryset,
+                    field_name,
+                    ids,
+                    match_all=match == 'all',
+                )
+
+        search = params.get('search', '').strip()
+        if search:
+            queryset = search_recipes(queryset, search).order_by(
+                '-rank',
+                '-id',
+            )
+
+        return queryset
 
     def get_serializer_class(self):
         """retrieve serializer_class for the ViewSet."""
@@ -39,20 +163,210 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """create a new recipe"""
         serializer.save(user=self.request.user)
+        bump_data_version(self.request.user.id)
+
+    def perform_update(self, serializer):
+        """update a recipe"""
+        super().perform_update(serializer)
+        bump_data_version(self.request.user.id)
+
+    def perform_destroy(self, instance):
+        """delete a recipe"""
+        super().perform_destroy(instance)
+        bump_data_version(self.request.user.id)
+
+    @extend_schema(
+        request=RecipeDetailSerializer(many=True),
+        responses=RecipeDetailSerializer(many=True),
+    )
+    @action(detail=False, methods=['post', 'put', 'patch', 'delete'])
+    def bulk(self, request):
+        """Create, update or delete many recipes in one transaction.
+
+        POST takes a list of recipes, PUT and PATCH a list of recipes
+        carrying their id, and DELETE a list of recipe ids. Results are
+        returned per item, in the order they were sent.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError('Expected a list of items.')
+        if len(items) > self.bulk_max_items:
+            raise ValidationError(
+                f'At most {self.bulk_max_items} items can be sent at once.'
+            )
+
+        if request.method == 'POST':
+            response = self._bulk_create(items)
+        elif request.method == 'DELETE':
+            response = self._bulk_destroy(items)
+        else:
+            response = self._bulk_update(
+                items,
+                partial=request.method == 'PATCH',
+            )
+
+        bump_data_version(request.user.id)
+        return response
+
+    def _bulk_create(self, items):
+        """Create recipes from a list of items."""
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.save(user=self.request.user)
+        return Response(
+            self._bulk_results(recipes),
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _bulk_update(self, items, partial):
+        """Update the recipes identified by the id of each item."""
+        ids = [
+            item.get('id') if isinstance(item, dict) else None
+            for item in items
+        ]
+        ids = [i if isinstance(i, int) else None for i in ids]
+        recipes = Recipe.objects.filter(
+            user=self.request.user,
+            id__in=[i for i in ids if i is not None],
+        ).in_bulk()
 
+        errors = []
+        seen = set()
+        for recipe_id in ids:
+            if recipe_id not in recipes:
+                errors.append({'id': ['Not found.']})
+            elif recipe_id in seen:
+                errors.append({'id': ['Duplicate id.']})
+            else:
+                errors.append({})
+            seen.add(recipe_id)
+        if any(errors):
+            raise ValidationError(errors)
 
-class TagViewSet(
+        serializer = self.get_serializer(
+            [recipes[recipe_id] for recipe_id in ids],
+            data=items,
+            many=True,
+            partial=partial,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(self._bulk_results(serializer.instance))
+
+    def _bulk_destroy(self, ids):
+        """Delete the recipes with the given ids."""
+        if not all(isinstance(i, int) for i in ids):
+            raise ValidationError('Expected a list of recipe ids.')
+
+        recipes = Recipe.objects.filter(user=self.request.user, id__in=ids)
+        with transaction.atomic():
+            found = set(recipes.values_list('id', flat=True))
+            recipes.delete()
+
+        return Response([
+            {'id': recipe_id, 'deleted': recipe_id in found}
+            for recipe_id in ids
+        ])
+
+    @action(
+        detail=False,
+        methods=['get'],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request):
+        """Stream every recipe of the user as NDJSON or CSV.
+
+        The format is picked from the Accept header or `?format=`.
+        """
+        rows = iter_recipe_rows(
+            Recipe.objects.filter(user=request.user).order_by('id'),
+            chunk_size=self.export_chunk_size,
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(rows, header=EXPORT_COLUMNS),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{renderer.format}"'
+        )
+        return response
+
+    def _bulk_results(self, recipes):
+        """Serialize written recipes in order, prefetching nested data."""
+        saved = self.get_queryset().in_bulk([recipe.id for recipe in recipes])
+        return self.get_serializer(
+            [saved[recipe.id] for recipe in recipes],
+            many=True,
+        ).data
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'assigned_only',
+                OpenApiTypes.INT,
+                enum=[0, 1],
+                description='Filter by items assigned to recipes.',
+            ),
+            FIELDS_PARAMETER,
+        ]
+    )
+)
+class BaseRecipeAttrViewSet(
+    SparseFieldsetMixin,
+    ConditionalListMixin,
+    CachedListMixin,
     mixins.DestroyModelMixin,
     mixins.UpdateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet
 ):
+    """Base viewset for recipe attributes."""
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+    pagination_class = NameCursorPagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['name', 'recipe_count']
+    ordering = ['-name']
+
+    def get_queryset(self):
+        """Filter queryset to authenticated user."""
+        queryset = self.queryset.filter(
+            user=self.request.user
+        ).order_by('-name')
+        assigned_only = self.request.query_params.get('assigned_only', '0')
+        if assigned_only not in ('0', '1'):
+            raise ValidationError({'assigned_only': 'Expected 0 or 1.'})
+        if assigned_only == '1':
+            # Served by the (user, recipe_count, name) index, the through
+            # table is never read.
+            queryset = queryset.filter(recipe_count__gt=0)
+
+        return queryset
+
+    def perform_update(self, serializer):
+        """update an attribute"""
+        super().perform_update(serializer)
+        bump_data_version(self.request.user.id)
+
+    def perform_destroy(self, instance):
+        """delete an attribute"""
+        super().perform_destroy(instance)
+        bump_data_version(self.request.user.id)
+
+
+class TagViewSet(BaseRecipeAttrViewSet):
     """Manage Tags in the Database"""
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
-    authentication_classes = [TokenAuthentication]
-    permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
-        """retrieve all tag objects of an authenticated user"""
-        return Tag.objects.filter(user=self.request.user).order_by('-name')
+
+class IngredientViewSet(BaseRecipeAttrViewSet):
+    """Manage Ingredients in the Database"""
+    serializer_class = IngredientSerializer
+    queryset = Ingredient.objects.all()
@@ -0,0 +1,108 @@
+"""
+Authentication classes for the API.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+def get_token_cache():
+    """Return the cache backend used for token lookups."""
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key):
+    """Return the cache key for a token, without exposing the token."""
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def user_cache_key(user_id):
+    """Return the cache key for the user of signed tokens."""
+    return f'auth-user:{user_id}'
+
+
+def get_token_signer():
+    """Return the signer of signed access tokens."""
+    return signing.TimestampSigner(salt='user.signed-token')
+
+
+def issue_signed_token(user):
+    """Return a signed access token for the current token version of user."""
+    return get_token_signer().sign(f'{user.pk}.{user.token_version}')
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token to user mapping.
+
+    Entries live for AUTH_TOKEN_CACHE_TIMEOUT seconds and are dropped as
+    soon as the token is deleted or its user is saved, see user.signals.
+    That only reaches every process when AUTH_TOKEN_CACHE_ALIAS is a
+    shared cache, see user.checks.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+        return (token.user, token)
+
+
+class SignedTokenAuthentication(TokenAuthentication):
+    """Authentication with signed, expiring access tokens.
+
+    Tokens carry the user id and token version, signed with SECRET_KEY:
+
+        Authorization: Bearer 42.0:1rFfXm:0V8yM...
+
+    Checking the signature and age needs no lookup. The user comes from
+    the token cache and is only read from the database on a miss, the
+    entry is dropped when the user is saved, see user.signals. Bumping
+    token_version revokes every token issued before, in every process
+    as long as the token cache is shared, see user.checks.
+    """
+    keyword = 'Bearer'
+
+    def authenticate_credentials(self, key):
+        try:
+            value = get_token_signer().unsign(
+                key,
+                max_age=settings.AUTH_SIGNED_TOKEN_MAX_AGE,
+            )
+            user_id, version = (int(part) for part in value.split('.'))
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        except (signing.BadSignature, ValueError):
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        user = self.get_user(user_id)
+        if user is None or user.token_version != version:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (user, key)
+
+    def get_user(self, user_id):
+        """Return the user with user_id, cached like token lookups."""
+        cache = get_token_cache()
+        cache_key = user_cache_key(user_id)
+        user = cache.get(cache_key)
+        if user is None:
+            user = get_user_model().objects.filter(pk=user_id).first()
+            if user is not None:
+                cache.set(cache_key, user, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+        return user
@@ -0,0 +1,14 @@
+"""
+System checks for the user app.
+"""
+
+from core.checks import warn_if_local_cache
+
+
+# Deleting a token or saving its user only drops the cached lookups of
+# the process that made the change, the others would keep authenticating
+# with them for up to AUTH_TOKEN_CACHE_TIMEOUT seconds.
+check_token_cache_is_shared = warn_if_local_cache(
+    'AUTH_TOKEN_CACHE_ALIAS',
+    'user.W001',
+)
@@ -6,6 +6,7 @@ from django.contrib.auth import (
     authenticate,
     get_user_model,
 )
+from django.db.models import F
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
@@ -23,15 +24,28 @@ class UserSerializer(serializers.ModelSerializer):
         return get_user_model().objects.create_user(**validated_data)
 
     def update(self, instance, validated_data):
-        """Update and return user."""
+        """Update and return user.
+
+        Only the changed fields are saved: the instance may come from the
+        token cache, and saving its stale token_version would undo a
+        concurrent revocation.
+        """
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        update_fields = list(validated_data)
+
+        if password:
+            instance.set_password(password)
+            # Signed tokens issued with the old password stop working.
+            instance.token_version = F('token_version') + 1
+            update_fields += ['password', 'token_version']
 
+        instance.save(update_fields=update_fields)
         if password:
-            user.set_password(password)
-            user.save()
+            instance.refresh_from_db(fields=['token_version'])
 
-        return user
+        return instance
 
 
 class AuthTokenSerializer(serializers.Serializer):
@@ -0,0 +1,43 @@
+"""
+Signal handlers for the user app.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import (
+    get_token_cache,
+    token_cache_key,
+    user_cache_key,
+)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """Drop the cached lookup of a deleted token."""
+    get_token_cache().delete(token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached token lookups when a user changes.
+
+    This covers deactivation, password changes, revoked signed tokens
+    and any other edit, so a cached lookup never outlives the user state
+    it was made with.
+    """
+    if created:
+        return
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    get_token_cache().delete_many(
+        [token_cache_key(key) for key in keys]
+        + [user_cache_key(instance.pk)]
+    )
+
+
+@receiver(post_delete, sender=get_user_model())
+def forget_deleted_user(sender, instance, **kwargs):
+    """Drop the cached user of signed tokens when the user is deleted."""
+    get_token_cache().delete(user_cache_key(instance.pk))
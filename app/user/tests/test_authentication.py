@@ -0,0 +1,263 @@
+"""
+Test the cached and signed token authentication.
+"""
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import checks
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+ME_URL = reverse('user:me')
+TOKEN_URL = reverse('user:token')
+REVOKE_URL = reverse('user:token-revoke')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating with cached token lookups."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='testuser@example.com',
+            password='testpass123',
+            name='Test User',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """Test the token is only looked up in the database once."""
+        with self.assertNumQueries(1):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is not authenticated."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """Test a cached token stops working once deleted."""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a cached token stops working once its user is inactive."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_refreshes_user(self):
+        """Test changing the password drops the cached lookup."""
+        self.client.get(ME_URL)
+
+        response = self.client.patch(ME_URL, {'password': 'newpass123'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(AUTH_TOKEN_MODE='signed', AUTH_SIGNED_TOKEN_MAX_AGE=60)
+class SignedTokenAuthenticationTests(TestCase):
+    """Test authenticating with signed access tokens."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='testuser@example.com',
+            password='testpass123',
+            name='Test User',
+        )
+        self.client = APIClient()
+
+    def _login(self, password='testpass123'):
+        """Return a signed token and authenticate the client with it."""
+        response = self.client.post(TOKEN_URL, {
+            'email': self.user.email,
+            'password': password,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token_type'], 'Bearer')
+        self.assertEqual(response.data['expires_in'], 60)
+        token = response.data['token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return token
+
+    def test_signed_token_issued(self):
+        """Test the token endpoint issues signed tokens, not Token rows."""
+        self._login()
+
+        self.assertFalse(Token.objects.exists())
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+
+    def test_signed_token_recipe_api(self):
+        """Test the recipe endpoints accept signed tokens."""
+        self._login()
+
+        response = self.client.get(RECIPES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_user_cached(self):
+        """Test the user is only read from the database once."""
+        self._login()
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_tampered_token_rejected(self):
+        """Test a token with another user id is rejected."""
+        token = self._login()
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        forged = f'{other.id}.0' + token[token.index(':'):]
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {forged}')
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_token_rejected(self):
+        """Test a token older than AUTH_SIGNED_TOKEN_MAX_AGE is rejected."""
+        self._login()
+
+        later = time.time() + 61
+        with patch('django.core.signing.time.time', return_value=later):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(str(response.data['detail']), 'Token has expired.')
+
+    def test_revoke_tokens(self):
+        """Test revoking invalidates the tokens issued before."""
+        self._login()
+        self.client.get(ME_URL)
+
+        response = self.client.post(REVOKE_URL)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self._login()
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_user_token_rejected(self):
+        """Test the signed token of a deleted user stops working."""
+        self._login()
+        self.client.get(ME_URL)
+
+        self.user.delete()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_deletes_token_rows(self):
+        """Test revoking also deletes the user's Token row."""
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        response = self.client.post(REVOKE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+    def test_password_change_revokes_tokens(self):
+        """Test changing the password invalidates signed tokens."""
+        token = self._login()
+
+        response = self.client.patch(ME_URL, {'password': 'newpass123'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test tokens stop working once the user is inactive."""
+        self._login()
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_keeps_concurrent_revocation(self):
+        """Test a stale cached user never undoes another version bump."""
+        self._login()
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            token_version=F('token_version') + 1,
+        )
+
+        response = self.client.patch(ME_URL, {'password': 'newpass123'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 2)
+        self.assertTrue(self.user.check_password('newpass123'))
+
+
+class TokenCacheCheckTests(TestCase):
+    """Test the check of the token cache backend."""
+
+    def _warnings(self):
+        return [
+            message.id for message in checks.run_checks(
+                tags=[checks.Tags.caches],
+                include_deployment_checks=True,
+            )
+        ]
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_local_memory_cache_warns(self):
+        """Test a per-process token cache is reported on deploy checks."""
+        self.assertIn('user.W001', self._warnings())
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache',
+    }})
+    def test_shared_cache_passes(self):
+        """Test a token cache shared by processes is accepted."""
+        self.assertNotIn('user.W001', self._warnings())
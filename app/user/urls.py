@@ -3,7 +3,12 @@ Urls for the User Service/App.
 """
 
 from django.urls import path
-from user.views import CreateUserView, AuthTokenView, ManageUserView
+from user.views import (
+    CreateUserView,
+    AuthTokenView,
+    ManageUserView,
+    RevokeTokensView,
+)
 
 
 app_name = 'user'
@@ -11,5 +16,6 @@ app_name = 'user'
 urlpatterns = [
     path('create/', CreateUserView.as_view(), name='create'),
     path('token/', AuthTokenView.as_view(), name='token'),
+    path('token/revoke/', RevokeTokensView.as_view(), name='token-revoke'),
     path('me/', ManageUserView.as_view(), name='me'),
 ]
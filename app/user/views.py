@@ -2,10 +2,20 @@
 Views for the user API
 """
 
-from rest_framework import generics, authentication, permissions
+from django.conf import settings
+from django.db.models import F
+from rest_framework import generics, permissions, status
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from user.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+    issue_signed_token,
+)
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer
@@ -15,18 +25,56 @@ from user.serializers import (
 class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = UserSerializer
+    authentication_classes = []
 
 
 class AuthTokenView(ObtainAuthToken):
-    """Create Tokens for User Authorization."""
+    """Create Tokens for User Authorization.
+
+    With AUTH_TOKEN_MODE set to "signed" a short-lived signed access token
+    is returned instead of the user's Token row.
+    """
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # Logging in must work while an old token is still sent along.
+    authentication_classes = []
+
+    def post(self, request, *args, **kwargs):
+        if settings.AUTH_TOKEN_MODE != 'signed':
+            return super().post(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({
+            'token': issue_signed_token(serializer.validated_data['user']),
+            'token_type': SignedTokenAuthentication.keyword,
+            'expires_in': settings.AUTH_SIGNED_TOKEN_MAX_AGE,
+        })
+
+
+class RevokeTokensView(APIView):
+    """Revoke every token of the authenticated user."""
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        user.token_version = F('token_version') + 1
+        user.save(update_fields=['token_version'])
+        Token.objects.filter(user=user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):